@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 
-from app.api.api_v1.endpoints import auth, credit_card, posts, users, votes
+from app.api.api_v1.endpoints import admin, auth, credit_card, posts, users, votes
 
 api_router = APIRouter()
 
@@ -11,3 +11,4 @@ api_router.include_router(
     credit_card.router, prefix="/credit-card", tags=["Credit Card"]
 )
 api_router.include_router(votes.router, prefix="/votes", tags=["Votes"])
+api_router.include_router(admin.router, prefix="/admin", tags=["Admin"])
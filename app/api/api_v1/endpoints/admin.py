@@ -0,0 +1,230 @@
+import tracemalloc
+from typing import Annotated, Any
+
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, status
+
+from app.api.default_responses import default_responses
+from app.core.config import settings
+from app.core.memory import (
+    GroupBy,
+    SnapshotNotFound,
+    StoredSnapshot,
+    TracingNotStarted,
+    memory_profiler,
+    memory_stats,
+)
+from app.core.oauth import get_admin_principal
+from app.schemas import (
+    AllocationDiff,
+    AllocationStat,
+    MemoryStatus,
+    MessageDetail,
+    SnapshotOut,
+)
+
+# Memory snapshots live in the worker serving the request, with several
+# workers every call may hit a different one (see `pid`)
+router = APIRouter(dependencies=[Depends(get_admin_principal)])
+
+admin_responses: dict[int | str, dict[str, Any]] = {
+    **default_responses,
+    403: {
+        "description": "Forbidden",
+        "model": MessageDetail,
+        "content": {
+            "application/json": {
+                "example": {"detail": "Not authorized to perform requested action"}
+            }
+        },
+    },
+}
+snapshot_not_found: dict[int | str, dict[str, Any]] = {
+    404: {
+        "description": "Snapshot not found",
+        "model": MessageDetail,
+        "content": {"application/json": {"example": {"detail": "Snapshot not found"}}},
+    },
+}
+
+GroupByParam = Annotated[
+    GroupBy,
+    Query(description="Group allocations by `lineno`, `filename` or `traceback`"),
+]
+LimitParam = Annotated[
+    int, Query(description="Number of allocators returned", ge=1, le=1000)
+]
+SnapshotID = Annotated[int, Path(description="The ID of the snapshot")]
+
+
+def memory_status() -> MemoryStatus:
+    traced_memory, traced_memory_peak = tracemalloc.get_traced_memory()
+    return MemoryStatus(
+        **memory_stats(),
+        tracing=memory_profiler.tracing,
+        traced_memory=traced_memory,
+        traced_memory_peak=traced_memory_peak,
+        snapshots=[snapshot_out(stored) for stored in memory_profiler.snapshots],
+    )
+
+
+def snapshot_out(stored: StoredSnapshot) -> SnapshotOut:
+    return SnapshotOut(
+        id=stored.id, taken_at=stored.taken_at, traced_memory=stored.traced_memory
+    )
+
+
+def allocation(
+    stat: tracemalloc.Statistic | tracemalloc.StatisticDiff,
+) -> dict[str, Any]:
+    frames = [f"{frame.filename}:{frame.lineno}" for frame in stat.traceback]
+    return {
+        "location": frames[-1],
+        "traceback": frames,
+        "size": stat.size,
+        "count": stat.count,
+    }
+
+
+@router.get(
+    "/memory",
+    status_code=status.HTTP_200_OK,
+    responses={
+        **admin_responses,
+        200: {"description": "Memory usage of the worker", "model": MemoryStatus},
+    },
+)
+def get_memory() -> MemoryStatus:
+    """
+    ### Get memory usage of the worker
+    """
+    return memory_status()
+
+
+@router.post(
+    "/memory/tracemalloc/start",
+    status_code=status.HTTP_200_OK,
+    responses={
+        **admin_responses,
+        200: {"description": "Tracing started", "model": MemoryStatus},
+    },
+)
+def start_tracemalloc(
+    frames: Annotated[
+        int | None,
+        Query(description="Frames stored per allocation traceback", ge=1, le=100),
+    ] = None,
+) -> MemoryStatus:
+    """
+    ### Start tracing memory allocations
+
+    Every allocation gets slower while tracing, stop it once done.
+    """
+    memory_profiler.start(frames or settings.MEMORY_TRACE_FRAMES)
+    return memory_status()
+
+
+@router.post(
+    "/memory/tracemalloc/stop",
+    status_code=status.HTTP_200_OK,
+    responses={
+        **admin_responses,
+        200: {"description": "Tracing stopped", "model": MemoryStatus},
+    },
+)
+def stop_tracemalloc() -> MemoryStatus:
+    """
+    ### Stop tracing memory allocations
+    """
+    memory_profiler.stop()
+    return memory_status()
+
+
+@router.post(
+    "/memory/snapshots",
+    status_code=status.HTTP_201_CREATED,
+    responses={
+        **admin_responses,
+        201: {"description": "Snapshot taken", "model": SnapshotOut},
+        409: {
+            "description": "Tracing not started",
+            "model": MessageDetail,
+            "content": {
+                "application/json": {"example": {"detail": "Tracing not started"}}
+            },
+        },
+    },
+)
+def take_snapshot() -> SnapshotOut:
+    """
+    ### Take a snapshot of the traced allocations
+    """
+    try:
+        stored = memory_profiler.take_snapshot()
+    except TracingNotStarted as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT, detail="Tracing not started"
+        ) from e
+    return snapshot_out(stored)
+
+
+@router.get(
+    "/memory/snapshots/{snapshot_id}",
+    status_code=status.HTTP_200_OK,
+    responses={
+        **admin_responses,
+        **snapshot_not_found,
+        200: {"description": "Top allocators", "model": list[AllocationStat]},
+    },
+)
+def get_snapshot(
+    snapshot_id: SnapshotID,
+    group_by: GroupByParam = "lineno",
+    limit: LimitParam = 20,
+) -> list[AllocationStat]:
+    """
+    ### Get the top allocators of a snapshot
+    """
+    try:
+        stats = memory_profiler.top(snapshot_id, group_by, limit)
+    except SnapshotNotFound as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Snapshot not found"
+        ) from e
+    return [AllocationStat(**allocation(stat)) for stat in stats]
+
+
+@router.get(
+    "/memory/snapshots/{snapshot_id}/diff",
+    status_code=status.HTTP_200_OK,
+    responses={
+        **admin_responses,
+        **snapshot_not_found,
+        200: {"description": "Top allocators growth", "model": list[AllocationDiff]},
+    },
+)
+def diff_snapshot(
+    snapshot_id: SnapshotID,
+    base: Annotated[
+        int | None,
+        Query(description="ID of the base snapshot, the previous one by default"),
+    ] = None,
+    group_by: GroupByParam = "lineno",
+    limit: LimitParam = 20,
+) -> list[AllocationDiff]:
+    """
+    ### Diff a snapshot against a previous one
+
+    Allocators are sorted by the absolute growth of their memory.
+    """
+    try:
+        stats = memory_profiler.diff(snapshot_id, base, group_by, limit)
+    except SnapshotNotFound as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Snapshot not found"
+        ) from e
+    return [
+        AllocationDiff(
+            **allocation(stat), size_diff=stat.size_diff, count_diff=stat.count_diff
+        )
+        for stat in stats
+    ]
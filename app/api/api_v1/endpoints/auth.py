@@ -1,18 +1,36 @@
 from typing import Any
 
-from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from fastapi.security.oauth2 import OAuth2PasswordRequestForm
+from loguru import logger
 from sqlalchemy.orm import Session
 
-from app.core.oauth import create_access_token, oauth
+from app.api.default_responses import default_responses
+from app.api.deps import CurrentPrincipal
+from app.core.config import settings
+from app.core.oauth import (
+    create_access_token,
+    oauth,
+    revoke_tokens,
+    token_generation,
+)
 from app.db.database import get_db
 from app.models import User
-from app.schemas import Token
-from app.utils import verify_password
+from app.schemas import MessageDetail, Token
+from app.services.login_throttle import login_throttle
+from app.utils import PasswordHasherBusy, password_hasher, password_needs_rehash
 
 router = APIRouter()
 
 
+async def issue_token(user: User) -> str:
+    claims: dict[str, Any] = {"sub": user.id, "email": user.email}
+    # Tokens issued after a logout belong to the new generation
+    if settings.TOKEN_REVOCATION_ENABLED:
+        claims["gen"] = await token_generation(user.id)
+    return create_access_token(data=claims)
+
+
 @router.get("/login/google")
 async def login_google(request: Request) -> Any:
     """
@@ -35,29 +53,96 @@ async def auth_via_google(request: Request, db: Session = Depends(get_db)) -> An
             status_code=status.HTTP_403_FORBIDDEN, detail="Invalid Credentials"
         )
 
-    access_token = create_access_token(data={"sub": user.id})
+    access_token = await issue_token(user)
     return {"access_token": access_token, "token_type": "bearer"}
 
 
 @router.post("/login", response_model=Token)
 async def login(
+    request: Request,
     user_credentials: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_db),
 ) -> Any:
     """
     ### Login user
     """
-    user = db.query(User).filter(User.email == user_credentials.username).first()
+    # Throttle failed logins before spending any bcrypt time
+    ip = request.client.host if request.client else "unknown"
+    username = user_credentials.username
+    if retry_after := await login_throttle.retry_after(ip, username):
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many failed login attempts",
+            headers={"Retry-After": str(retry_after)},
+        )
+
+    user = db.query(User).filter(User.email == username).first()
 
     if not user:
+        await login_throttle.record_failure(ip, username)
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, detail="Invalid Credentials"
         )
 
-    if not verify_password(user_credentials.password, user.password):
+    try:
+        valid = await password_hasher.verify(user_credentials.password, user.password)
+    except PasswordHasherBusy as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many logins in progress",
+            headers={"Retry-After": "1"},
+        ) from e
+
+    if not valid:
+        await login_throttle.record_failure(ip, username)
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, detail="Invalid Credentials"
         )
 
-    access_token = create_access_token(data={"sub": user.id})
+    await login_throttle.reset(username)
+
+    # Upgrade (or downgrade) hashes made with another BCRYPT_ROUNDS
+    if password_needs_rehash(user.password):
+        try:
+            user.password = await password_hasher.hash(user_credentials.password)
+            db.commit()
+            logger.info(f"Password rehashed for user {user.id}")
+        except PasswordHasherBusy:
+            logger.warning(f"Password rehash postponed for user {user.id}")
+
+    access_token = await issue_token(user)
     return {"access_token": access_token, "token_type": "bearer"}
+
+
+@router.post(
+    "/logout",
+    status_code=status.HTTP_204_NO_CONTENT,
+    responses={
+        **default_responses,
+        204: {"description": "Tokens revoked"},
+        503: {
+            "description": "Tokens could not be revoked",
+            "model": MessageDetail,
+            "content": {
+                "application/json": {
+                    "example": {"detail": "Tokens could not be revoked"}
+                }
+            },
+        },
+    },
+)
+async def logout(principal: CurrentPrincipal) -> Response:
+    """
+    ### Logout user
+
+    Revokes every token issued to the user so far (`TOKEN_REVOCATION_ENABLED`).
+    """
+    try:
+        await revoke_tokens(principal.id)
+    except Exception as e:
+        logger.error(f"Error revoking tokens (user {principal.id}): {e}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Tokens could not be revoked",
+        ) from e
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -1,14 +1,32 @@
 from math import ceil
-from typing import Annotated, cast
-
-from fastapi import APIRouter, Body, Depends, HTTPException, Path, Response, status
+from typing import Annotated, Any, cast
+
+from fastapi import (
+    APIRouter,
+    Body,
+    Depends,
+    HTTPException,
+    Path,
+    Query,
+    Response,
+    status,
+)
 from fastapi.encoders import jsonable_encoder
 from loguru import logger
+from redis.exceptions import RedisError
 from sqlalchemy import delete, desc, func, select, update
 from sqlalchemy.orm import Session, joinedload
 
 from app.api.default_responses import default_responses
-from app.api.deps import CacheDep, CurrentUser, FilterParams
+from app.api.deps import (
+    CacheDep,
+    CurrentPrincipal,
+    CurrentUser,
+    IncludeParams,
+    PostFilters,
+    ReadDB,
+)
+from app.core.config import settings
 from app.db.database import get_db
 from app.models import Post, Vote
 from app.schemas import (
@@ -19,10 +37,43 @@ from app.schemas import (
     PostUpdateIn,
     PostUpdateOut,
 )
+from app.services.post_votes import PostVotesCache
+from app.services.trending import trending_posts
+from app.services.vote_buffer import vote_buffer
 
 router = APIRouter()
 
 
+async def include_my_votes(
+    posts: list[dict[str, Any]], user_id: int, db: Session
+) -> list[dict[str, Any]]:
+    """
+    Set the `my_vote` flag of (cached, user-agnostic) posts for the current user.
+
+    The whole page is resolved with a single query, checking the voters sets
+    first when votes are buffered.
+    """
+    post_ids = [post["Post"]["id"] for post in posts]
+    my_votes: dict[int, bool] = {}
+
+    if settings.VOTES_WRITE_BEHIND and post_ids:
+        try:
+            my_votes = await vote_buffer.voted(post_ids, user_id)
+        except RedisError as e:
+            logger.error(f"Error reading voters sets: {e}")
+
+    if missing := [post_id for post_id in post_ids if post_id not in my_votes]:
+        stmt_select = select(Vote.post_id).where(
+            Vote.user_id == user_id, Vote.post_id.in_(missing)
+        )
+        voted = set(db.execute(stmt_select).scalars().all())
+        my_votes.update({post_id: post_id in voted for post_id in missing})
+
+    for post in posts:
+        post["my_vote"] = my_votes[post["Post"]["id"]]
+    return posts
+
+
 @router.get(
     "/",
     description="""
@@ -41,7 +92,10 @@ router = APIRouter()
     Sorting by multiple fields is supported by separating them with commas (e.g., `title,-id`).
 
     The response includes both the posts data and these headers for pagination and filtering details.
+
+    Use `include=my_vote` to add whether the current user voted each post (`my_vote`).
     """,  # noqa: E501
+    response_model_exclude_none=True,
     status_code=status.HTTP_200_OK,
     responses={
         **default_responses,
@@ -60,22 +114,27 @@ router = APIRouter()
 )
 async def get_posts(
     response: Response,
-    filter_query: FilterParams,
-    _current_user: CurrentUser,
+    filter_query: PostFilters,
+    principal: CurrentPrincipal,
     cache: CacheDep,
-    db: Session = Depends(get_db),
+    db: ReadDB,
 ) -> list[PostOut]:
     """
     ### Get posts list
     """
     # 1. Attempt to get from cache using query params in the key
-    cache_key = f"posts:all:{filter_query.model_dump_json()}"
+    cache_key = cache.build_key("posts:all", filter_query.cache_params())
     cached_data = await cache.get(cache_key)
+    votes_cache = PostVotesCache(cache)
 
     if cached_data:
         # Restore headers from cached metadata
         response.headers.update(cached_data.get("headers", {}))
-        return cast(list[PostOut], cached_data.get("posts"))
+        # Merge fresh vote counts into the cached page
+        cached_posts = await votes_cache.merge(cached_data.get("posts", []))
+        if filter_query.include == "my_vote":
+            cached_posts = await include_my_votes(cached_posts, principal.id, db)
+        return cast(list[PostOut], cached_posts)
 
     # 2. Database Query
     votes_subquery = (
@@ -103,9 +162,8 @@ async def get_posts(
 
     # Sort
     try:
-        if filter_query.sort_by:
-            fields = filter_query.sort_by.split(",")
-            for field in fields:
+        if sort_fields := filter_query.sort_fields:
+            for field in sort_fields:
                 if field.startswith("-"):
                     stmt_select = stmt_select.order_by(desc(getattr(Post, field[1:])))
                 else:
@@ -139,10 +197,21 @@ async def get_posts(
     # 3. Save to cache
     posts_list = [{"Post": row[0], "votes": row[1]} for row in posts]
     validated_posts = jsonable_encoder([PostOut.model_validate(p) for p in posts_list])
-    cache_payload = {"posts": validated_posts, "headers": headers}
-    await cache.set(cache_key, cache_payload, ex=600)
+    # A lagging replica may miss recent writes, only cache what the primary read
+    if db.info.get("replica") is None:
+        cache_payload = {"posts": validated_posts, "headers": headers}
+        await cache.set(cache_key, cache_payload, ex=600)
+        await votes_cache.seed({row[0].id: row[1] for row in posts}, ex=600)
+
+    # Buffered votes are not in the database yet
+    if settings.VOTES_WRITE_BEHIND:
+        validated_posts = await votes_cache.merge(validated_posts)
+    elif filter_query.include != "my_vote":
+        return posts  # type: ignore[return-value]
 
-    return posts  # type: ignore[return-value]
+    if filter_query.include == "my_vote":
+        validated_posts = await include_my_votes(validated_posts, principal.id, db)
+    return cast(list[PostOut], validated_posts)
 
 
 @router.post(
@@ -171,11 +240,91 @@ async def create_posts(
     db.commit()
     db.refresh(new_post)
 
+    await cache.delete(f"posts:{new_post.id}")
     await cache.clear_pattern("posts:all:*")
+    await trending_posts.add_post(new_post.id)
 
     return new_post  # type: ignore[return-value]
 
 
+@router.get(
+    "/trending",
+    description="""
+    Get trending posts
+
+    Returns the top posts ranked by their votes with time decay: newer votes weigh
+    more than older ones, so recently active posts rise to the top.
+    """,  # noqa: E501
+    status_code=status.HTTP_200_OK,
+    responses={
+        **default_responses,
+        200: {
+            "description": "List of trending posts",
+            "model": list[PostOut],
+        },
+    },
+    response_model_exclude_none=True,
+)
+async def get_trending_posts(
+    _principal: CurrentPrincipal,
+    cache: CacheDep,
+    db: ReadDB,
+    limit: Annotated[
+        int, Query(description="Number of posts to return", ge=1, le=100)
+    ] = 10,
+) -> list[PostOut]:
+    """
+    ### Get trending posts
+    """
+    stmt_select = select(
+        Post,
+        select(func.count(Vote.post_id))
+        .where(Vote.post_id == Post.id)
+        .scalar_subquery()
+        .label("votes"),
+    ).options(joinedload(Post.owner))
+
+    # 1. Get ranking
+    try:
+        post_ids = await trending_posts.top(limit, db)
+    except RedisError as e:
+        logger.error(f"Trending ranking unavailable, using most voted posts: {e}")
+        post_ids = None
+
+    # Ranking unavailable or being built by another worker
+    if post_ids is None:
+        stmt_select = stmt_select.order_by(desc("votes"), desc(Post.id)).limit(limit)
+        return db.execute(stmt_select).all()  # type: ignore[return-value]
+
+    # 2. Get posts from cache, or from DB if not cached
+    cached_posts = await cache.get_many([f"posts:{post_id}" for post_id in post_ids])
+    posts_by_id = {
+        post_id: cached_post
+        for post_id, cached_post in zip(post_ids, cached_posts, strict=True)
+        if cached_post and not cache.is_missing(cached_post)
+    }
+
+    missing_ids = [post_id for post_id in post_ids if post_id not in posts_by_id]
+    if missing_ids:
+        rows = db.execute(stmt_select.where(Post.id.in_(missing_ids))).all()
+        for row in rows:
+            post_data = {"Post": row[0], "votes": row[1]}
+            validated_data = jsonable_encoder(PostOut.model_validate(post_data))
+            posts_by_id[row[0].id] = validated_data
+            # Single posts are read from the primary, do not cache replica rows
+            if db.info.get("replica") is None:
+                await cache.set(f"posts:{row[0].id}", validated_data, ex=3600)
+
+    # Deleted posts may still be ranked until removed
+    posts = [posts_by_id[post_id] for post_id in post_ids if post_id in posts_by_id]
+
+    # Buffered votes are not in the database yet
+    if settings.VOTES_WRITE_BEHIND:
+        posts = await PostVotesCache(cache).merge(posts)
+
+    return cast(list[PostOut], posts)
+
+
 @router.get(
     "/{id}",
     status_code=status.HTTP_200_OK,
@@ -191,12 +340,14 @@ async def create_posts(
             "content": {"application/json": {"example": {"detail": "Post not found"}}},
         },
     },
+    response_model_exclude_none=True,
 )
 async def get_post(
     id: Annotated[int, Path(description="The ID of the post to get")],
-    _current_user: CurrentUser,
+    principal: CurrentPrincipal,
     cache: CacheDep,
     db: Session = Depends(get_db),
+    include: IncludeParams = None,
 ) -> PostOut:
     """
     ### Get post by id
@@ -204,7 +355,13 @@ async def get_post(
     # 1. Check cache
     cache_key = f"posts:{id}"
     cached_post = await cache.get(cache_key)
+    if cache.is_missing(cached_post):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Post not found"
+        )
     if cached_post:
+        if include == "my_vote":
+            [cached_post] = await include_my_votes([cached_post], principal.id, db)
         return cast(PostOut, cached_post)
 
     # 2. Get post from DB
@@ -226,6 +383,7 @@ async def get_post(
 
     # Check if post exists
     if not post:
+        await cache.set_missing(cache_key)
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Post not found"
         )
@@ -233,8 +391,18 @@ async def get_post(
     # 3. Save to cache
     post_data = {"Post": post[0], "votes": post[1]}
     validated_data = jsonable_encoder(PostOut.model_validate(post_data))
+
+    # Buffered votes are not in the database yet
+    if settings.VOTES_WRITE_BEHIND:
+        [validated_data] = await PostVotesCache(cache).merge([validated_data])
     await cache.set(cache_key, validated_data, ex=3600)
 
+    if include == "my_vote":
+        [validated_data] = await include_my_votes([validated_data], principal.id, db)
+        return cast(PostOut, validated_data)
+    if settings.VOTES_WRITE_BEHIND:
+        return cast(PostOut, validated_data)
+
     return post  # type: ignore[return-value]
 
 
@@ -300,6 +468,10 @@ async def delete_post(
 
     await cache.delete(f"posts:{id}")
     await cache.clear_pattern("posts:all:*")
+    await PostVotesCache(cache).forget(id)
+    if settings.VOTES_WRITE_BEHIND:
+        await vote_buffer.forget(id)
+    await trending_posts.forget(id)
 
     return Response(status_code=status.HTTP_204_NO_CONTENT)  # type: ignore[return-value] # noqa: E501
 
@@ -5,9 +5,16 @@ from fastapi import APIRouter, Depends, HTTPException, Path, Response, status
 from loguru import logger
 from sqlalchemy import String, cast, desc, func, or_, select
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from app.api.default_responses import default_responses
-from app.api.deps import CurrentUser, FilterParams
+from app.api.deps import (
+    CacheDep,
+    CurrentPrincipal,
+    CurrentUser,
+    FilterParams,
+    ReadDB,
+)
 from app.db.database import get_db
 from app.models import User
 from app.schemas import (
@@ -15,11 +22,18 @@ from app.schemas import (
     UserCreate,
     UserOut,
 )
-from app.utils import get_password_hash
+from app.services.user_cache import user_cache
+from app.utils import PasswordHasherBusy, password_hasher
 
 router = APIRouter()
 
 
+def save_user(db: Session, user: User) -> None:
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+
+
 @router.post(
     "/",
     status_code=status.HTTP_201_CREATED,
@@ -36,15 +50,26 @@ router = APIRouter()
                 "application/json": {"example": {"detail": "User already exists"}}
             },
         },
+        503: {
+            "description": "Too many signups in progress",
+            "model": MessageDetail,
+            "content": {
+                "application/json": {
+                    "example": {"detail": "Too many signups in progress"}
+                }
+            },
+        },
     },
 )
-def create_user(user: UserCreate, db: Session = Depends(get_db)) -> UserOut:
+async def create_user(
+    user: UserCreate, cache: CacheDep, db: Session = Depends(get_db)
+) -> UserOut:
     """
     ### Create user
     """
-    # Check if user exists
+    # Check if user exists (queries run in the threadpool, off the event loop)
     stmt_select = select(User).filter_by(email=user.email)
-    user_exists = db.execute(stmt_select).scalars().first()
+    user_exists = await run_in_threadpool(db.scalar, stmt_select)
 
     if user_exists:
         raise HTTPException(
@@ -53,12 +78,20 @@ def create_user(user: UserCreate, db: Session = Depends(get_db)) -> UserOut:
         )
 
     # Create user
-    hashed_password = get_password_hash(user.password)
+    try:
+        hashed_password = await password_hasher.hash(user.password)
+    except PasswordHasherBusy as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many signups in progress",
+            headers={"Retry-After": "1"},
+        ) from e
     user.password = hashed_password
     new_user = User(**user.model_dump())
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await run_in_threadpool(save_user, db, new_user)
+
+    await cache.delete(f"users:{new_user.id}")
+    await run_in_threadpool(user_cache.invalidate, new_user.id)
 
     return new_user  # type: ignore[return-value]
 
@@ -99,20 +132,32 @@ def get_user_me(
         },
     },
 )
-def get_user(
+async def get_user(
     id: Annotated[int, Path(description="The ID of the user to get")],
-    _current_user: CurrentUser,
-    db: Session = Depends(get_db),
+    _principal: CurrentPrincipal,
+    cache: CacheDep,
+    db: ReadDB,
 ) -> UserOut:
     """
     ### Get user by id
     """
-    # Get user
+    # Check cache for a previous not found result
+    cache_key = f"users:{id}"
+    if cache.is_missing(await cache.get(cache_key)):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found",
+        )
+
+    # Get user (in the threadpool, off the event loop)
     stmt_select = select(User).where(User.id == id).limit(1)
-    user = db.execute(stmt_select).scalars().first()
+    user = await run_in_threadpool(db.scalar, stmt_select)
 
     # Check if user not found
     if not user:
+        # A lagging replica may not have the user yet, do not cache its miss
+        if db.info.get("replica") is None:
+            await cache.set_missing(cache_key)
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found",
@@ -158,8 +203,8 @@ def get_user(
 def get_users(
     response: Response,
     filter_query: FilterParams,
-    _current_user: CurrentUser,
-    db: Session = Depends(get_db),
+    _principal: CurrentPrincipal,
+    db: ReadDB,
 ) -> list[UserOut]:
     """
     ### Get users list
@@ -185,9 +230,8 @@ def get_users(
 
     # Sort
     try:
-        if filter_query.sort_by:
-            fields = filter_query.sort_by.split(",")
-            for field in fields:
+        if sort_fields := filter_query.sort_fields:
+            for field in sort_fields:
                 if field.startswith("-"):
                     stmt_select = stmt_select.order_by(desc(getattr(User, field[1:])))
                 else:
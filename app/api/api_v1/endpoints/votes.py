@@ -1,18 +1,88 @@
-from typing import Any
+from datetime import datetime
+from typing import Any, cast
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from loguru import logger
+from psycopg.errors import ForeignKeyViolation
+from redis.exceptions import RedisError
 from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from app.api.default_responses import default_responses
-from app.api.deps import CurrentUser
+from app.api.deps import CacheDep, CurrentUser
+from app.core.config import settings
 from app.db.database import get_db
 from app.models import Post, Vote
 from app.schemas import Message, MessageDetail
 from app.schemas import Vote as VoteSchema
+from app.services.post_votes import PostVotesCache
+from app.services.trending import trending_posts
+from app.services.vote_buffer import vote_buffer
 
 router = APIRouter()
 
+# Default Postgres name of the votes.post_id foreign key
+POST_FOREIGN_KEY = "votes_post_id_fkey"
+
+
+def add_vote(db: Session, post_id: int, user_id: int) -> None:
+    """Add a vote in the database, a missing post violates the foreign key."""
+    stmt_insert_vote = (
+        insert(Vote)
+        .values(post_id=post_id, user_id=user_id)
+        .on_conflict_do_nothing()
+        .returning(Vote.post_id)
+    )
+    try:
+        new_vote = db.execute(stmt_insert_vote).first()
+    except IntegrityError as e:
+        db.rollback()
+        if (
+            isinstance(e.orig, ForeignKeyViolation)
+            and e.orig.diag.constraint_name == POST_FOREIGN_KEY
+        ):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Post not found",
+            ) from e
+        raise
+
+    if not new_vote:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Post already voted by user",
+        )
+    db.commit()
+
+
+def remove_vote(db: Session, post_id: int, user_id: int) -> datetime:
+    """Delete a vote from the database. Returns when it was cast."""
+    stmt_delete_vote = (
+        delete(Vote)
+        .where(Vote.post_id == post_id, Vote.user_id == user_id)
+        .execution_options(synchronize_session=False)
+        .returning(Vote.post_id, Vote.created_at)
+    )
+    deleted_vote = db.execute(stmt_delete_vote).first()
+    db.commit()
+
+    if not deleted_vote:
+        # Only look up the post to tell apart which one is missing
+        stmt_select = select(Post.id).where(Post.id == post_id)
+        if db.execute(stmt_select).first() is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Post not found",
+            )
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Vote does not exist"
+        )
+    return cast(datetime, deleted_vote.created_at)
+
 
 @router.post(
     "/",
@@ -58,59 +128,66 @@ router = APIRouter()
         },
     },
 )
-def vote_post(
+async def vote_post(
     vote: VoteSchema,
     current_user: CurrentUser,
+    cache: CacheDep,
     db: Session = Depends(get_db),
 ) -> Any:
     """
     ### Vote a post
     """
-    # Get post
-    stmt_select = select(Post).where(Post.id == vote.post_id)
-    post = db.execute(stmt_select).scalars().first()
-
-    # Check if post exists
-    if not post:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Post not found",
-        )
-
-    # Check if vote exists
-    stmt_select_vote = select(Vote).where(
-        Vote.post_id == vote.post_id, Vote.user_id == current_user.id
-    )
-
-    found_vote = db.execute(stmt_select_vote).scalars().first()
-
-    if vote.dir == 1:
-        if found_vote:
+    # Record vote in the write-behind buffer
+    if settings.VOTES_WRITE_BEHIND:
+        try:
+            recorded = await vote_buffer.record(
+                vote.post_id, current_user.id, vote.dir, db
+            )
+        except RedisError as e:
+            logger.error(f"Vote buffer unavailable, writing to database: {e}")
+        else:
+            if recorded is None:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Post not found",
+                )
+            if vote.dir == 1:
+                if not recorded:
+                    raise HTTPException(
+                        status_code=status.HTTP_409_CONFLICT,
+                        detail="Post already voted by user",
+                    )
+                await trending_posts.add_vote(vote.post_id, 1)
+                return {"message": "Successfully added vote"}
+            if not recorded:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND, detail="Vote does not exist"
+                )
+            # Votes not flushed yet were cast moments ago
+            stmt_voted_at = select(Vote.created_at).where(
+                Vote.post_id == vote.post_id, Vote.user_id == current_user.id
+            )
+            voted_at = await run_in_threadpool(db.scalar, stmt_voted_at)
+            await trending_posts.add_vote(vote.post_id, -1, voted_at)
             raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail="Post already voted by user",
+                status_code=status.HTTP_204_NO_CONTENT,
             )
 
-        # Add vote in db
-        new_vote = Vote(post_id=vote.post_id, user_id=current_user.id)
-        db.add(new_vote)
-        db.commit()
+    # Queries run in the threadpool, off the event loop
+    if vote.dir == 1:
+        await run_in_threadpool(add_vote, db, vote.post_id, current_user.id)
+
+        await PostVotesCache(cache).adjust(vote.post_id, 1)
+        await trending_posts.add_vote(vote.post_id, 1)
 
         return {"message": "Successfully added vote"}
     else:
-        if not found_vote:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND, detail="Vote does not exist"
-            )
-
-        # Delete vote in db
-        stmt_delete_vote = (
-            delete(Vote)
-            .where(Vote.post_id == vote.post_id, Vote.user_id == current_user.id)
-            .execution_options(synchronize_session=False)
+        voted_at = await run_in_threadpool(
+            remove_vote, db, vote.post_id, current_user.id
         )
-        db.execute(stmt_delete_vote)
-        db.commit()
+
+        await PostVotesCache(cache).adjust(vote.post_id, -1)
+        await trending_posts.add_vote(vote.post_id, -1, voted_at)
 
         raise HTTPException(
             status_code=status.HTTP_204_NO_CONTENT,
@@ -1,10 +1,16 @@
-from typing import Annotated
+from collections.abc import Generator
+from typing import Annotated, Any, Literal
 
 from fastapi import Depends, Query, Request
 from pydantic import BaseModel
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
 
-from app.core.oauth import get_current_user
+from app.core.oauth import get_current_principal, get_current_user, verify_token
+from app.db.database import get_db
+from app.db.replicas import recent_writes, replicas
 from app.models import User
+from app.schemas import Principal
 from app.services.cache import CacheService
 
 
@@ -18,8 +24,46 @@ async def get_cache_service(request: Request) -> CacheService:
     return CacheService(endpoint_path=route_path)
 
 
+def get_read_db(request: Request, db: Session = Depends(get_db)) -> Generator[Session]:
+    """
+    Session for read-only endpoints: a read replica when `DB_REPLICA_URLS` is
+    set, unless the user committed a write within `DB_READ_YOUR_WRITES_WINDOW`
+    seconds (or no replica is healthy), then the primary.
+    """
+    if not replicas.enabled:
+        yield db
+        return
+
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and token:
+        try:
+            user_id = verify_token(token).get("sub")
+        except Exception:
+            # Invalid tokens are rejected by the endpoint
+            user_id = None
+        if user_id is not None and recent_writes.wrote_recently(int(user_id)):
+            yield db
+            return
+
+    replica_db = replicas.session()
+    if replica_db is None:
+        yield db
+        return
+
+    try:
+        yield replica_db
+    except OperationalError:
+        replicas.mark_unhealthy(replica_db.info["replica"])
+        raise
+    finally:
+        replica_db.close()
+
+
 CurrentUser = Annotated[User, Depends(get_current_user)]
+# Claims-only user, for endpoints that do not need the `User` row
+CurrentPrincipal = Annotated[Principal, Depends(get_current_principal)]
 CacheDep = Annotated[CacheService, Depends(get_cache_service)]
+ReadDB = Annotated[Session, Depends(get_read_db)]
 
 
 class CommonFilterParams(BaseModel):
@@ -62,5 +106,54 @@ class CommonFilterParams(BaseModel):
         },
     )
 
+    @property
+    def sort_fields(self) -> list[str]:
+        """
+        Normalized `sort_by` fields: stripped, without empty or repeated entries.
+        Fields after `id` are dropped since the primary key is already unique.
+        """
+        fields: list[str] = []
+        seen: set[str] = set()
+        for raw_field in (self.sort_by or "").split(","):
+            field = raw_field.strip()
+            name = field.removeprefix("-")
+            if not name or name in seen:
+                continue
+            seen.add(name)
+            fields.append(field)
+            if name == "id":
+                break
+        return fields
+
+    def cache_params(self) -> dict[str, Any]:
+        """
+        Canonical representation of the filters, used to build cache keys.
+        Search is lowercased (matching is case-insensitive), the default sort
+        is elided and default values are omitted.
+        """
+        sort_by = ",".join(self.sort_fields)
+        params = {
+            "offset": self.offset,
+            "limit": self.limit,
+            "search": self.search.lower() if self.search else None,
+            "sort_by": sort_by if sort_by not in ("", "id") else None,
+        }
+        return {
+            name: value
+            for name, value in params.items()
+            if value != type(self).model_fields[name].default
+        }
+
+
+class PostFilterParams(CommonFilterParams):
+    include: Literal["my_vote"] | None = Query(
+        None, description="Include `my_vote`: whether the current user voted each post"
+    )
+
 
 FilterParams = Annotated[CommonFilterParams, Query()]
+PostFilters = Annotated[PostFilterParams, Query()]
+IncludeParams = Annotated[
+    Literal["my_vote"] | None,
+    Query(description="Include `my_vote`: whether the current user voted the post"),
+]
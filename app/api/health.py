@@ -7,8 +7,9 @@ from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
-from app.db.database import get_db
-from app.schemas import APIStatus
+from app.db.database import get_db, pool_stats
+from app.schemas import APIStatus, DBPoolStatus
+from app.utils import password_hasher
 
 router = APIRouter()
 
@@ -56,6 +57,8 @@ def health_api(
         timestamp=timestamp,
         version=settings.VERSION,
         uptime=uptime,
+        db_pool=DBPoolStatus(**stats) if (stats := pool_stats()) else None,
+        bcrypt_queue_depth=password_hasher.queued,
     )
 
     return resp
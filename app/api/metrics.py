@@ -0,0 +1,16 @@
+from fastapi import APIRouter, Response
+from prometheus_client import CONTENT_TYPE_LATEST
+from starlette.concurrency import run_in_threadpool
+
+from app.core.metrics import render
+
+router = APIRouter()
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics() -> Response:
+    """
+    ### Prometheus metrics
+    """
+    # Multiprocess mode reads the files of every worker
+    return Response(await run_in_threadpool(render), media_type=CONTENT_TYPE_LATEST)
@@ -15,6 +15,8 @@ def parse_cors(v: Any) -> list[str] | str:
 class Settings(BaseSettings):
     # FastAPI
     ENVIRONMENT: Literal["local", "staging", "production"] = "local"
+    # Number of worker processes (uvicorn --workers)
+    WEB_CONCURRENCY: int = 4
     VERSION: str = "1.0.0"
     API_V1_STR: str = "/api/v1"
     PROJECT_NAME: str = "FastAPI Google Auth Login"
@@ -43,6 +45,24 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    TOKEN_CACHE_SIZE: int = 10000
+    TOKEN_VERSION: int = 1
+    # Reject tokens issued before the user logged out (one Redis GET per request)
+    TOKEN_REVOCATION_ENABLED: bool = False
+    # IDs of the users allowed to use the admin tools (profiling, memory
+    # snapshots). Not emails: anyone can sign up with an unverified email
+    ADMIN_USER_IDS: list[int] = []
+
+    # Passwords
+    BCRYPT_ROUNDS: int = 12
+    BCRYPT_WORKERS: int = 2
+    BCRYPT_MAX_PENDING: int = 16
+
+    # Login throttling
+    LOGIN_THROTTLE_ENABLED: bool = True
+    LOGIN_THROTTLE_WINDOW: int = 900
+    LOGIN_THROTTLE_MAX_PER_IP: int = 50
+    LOGIN_THROTTLE_MAX_PER_ACCOUNT: int = 5
 
     # Google
     GOOGLE_CLIENT_ID: str
@@ -58,6 +78,20 @@ class Settings(BaseSettings):
     POSTGRES_USER: str
     POSTGRES_PASSWORD: str
     POSTGRES_DB: str
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # Pool-less mode, for a connection pooler such as PgBouncer
+    DB_POOL_DISABLED: bool = False
+    # Total connections of all the workers (split between WEB_CONCURRENCY)
+    DB_MAX_CONNECTIONS: int | None = None
+    # Read replicas (read-only endpoints)
+    DB_REPLICA_URLS: list[str] = []
+    DB_REPLICA_CHECK_INTERVAL: float = 10.0
+    DB_REPLICA_RETRY_AFTER: float = 30.0
+    DB_READ_YOUR_WRITES_WINDOW: float = 5.0
 
     @computed_field  # type: ignore[prop-decorator]
     @property
@@ -79,6 +113,83 @@ class Settings(BaseSettings):
     REDIS_PORT: int = 6379
     CACHE_ENABLED: bool = True
     CACHE_DISABLED_ENDPOINTS: list[str] = []
+    CACHE_NEGATIVE_TTL: int = 30
+    USER_CACHE_TTL: int = 60
+    USER_CACHE_LOCAL_TTL: float = 5.0
+    USER_CACHE_LOCAL_SIZE: int = 10000
+
+    # Votes
+    VOTES_WRITE_BEHIND: bool = False
+    VOTES_FLUSH_INTERVAL: float = 5.0
+    VOTES_FLUSH_BATCH_SIZE: int = 1000
+    VOTES_RECONCILE_INTERVAL: float = 300.0
+
+    # Trending
+    TRENDING_HALF_LIFE: int = 43200
+    TRENDING_MAX_POSTS: int = 1000
+
+    # Rate limiting
+    RATE_LIMIT_ENABLED: bool = False
+    RATE_LIMIT_BURST: int = 60
+    RATE_LIMIT_PER_SECOND: float = 10.0
+    RATE_LIMIT_EXEMPT_PATHS: list[str] = ["/health", "/metrics"]
+    # Seconds to wait on Redis before using the local buckets, and seconds to
+    # keep using them after a Redis error
+    RATE_LIMIT_REDIS_TIMEOUT: float = 0.05
+    RATE_LIMIT_REDIS_COOLDOWN: float = 5.0
+
+    # Load shedding (per worker)
+    LOAD_SHED_ENABLED: bool = True
+    LOAD_SHED_MAX_CONCURRENCY: int = 64
+    LOAD_SHED_MAX_QUEUE: int = 128
+    LOAD_SHED_QUEUE_TIMEOUT: float = 0.5
+    LOAD_SHED_RETRY_AFTER: int = 1
+    LOAD_SHED_ROUTE_CLASSES: dict[str, list[str]] = {
+        "auth": ["POST /api/v1/auth/login", "POST /api/v1/users/"]
+    }
+    LOAD_SHED_CLASS_LIMITS: dict[str, int] = {"auth": 8}
+    LOAD_SHED_EXEMPT_PATHS: list[str] = ["/health", "/metrics"]
+
+    # Observability
+    METRICS_ENABLED: bool = True
+    METRICS_SAMPLE_INTERVAL: float = 5.0
+    SERVER_TIMING_ENABLED: bool = True
+    # Queries per request above which a possible N+1 is logged
+    QUERY_COUNT_BUDGET: int = 20
+    # Queries slower than this (seconds) are logged, 0 disables the log
+    SLOW_QUERY_THRESHOLD: float = 0.5
+    # Share of slow SELECTs logged with EXPLAIN (ANALYZE, BUFFERS), which runs
+    # them again
+    SLOW_QUERY_EXPLAIN_SAMPLE_RATE: float = 0.0
+
+    # Event loop monitor (also records the event loop lag metric)
+    LOOP_MONITOR_ENABLED: bool = True
+    LOOP_MONITOR_INTERVAL: float = 0.1
+    # Callbacks blocking the event loop longer than this (seconds) are logged
+    LOOP_BLOCK_THRESHOLD: float = 0.25
+
+    # Profiling (pyinstrument)
+    # Admins can profile a request with the `X-Profile` header
+    PROFILING_ENABLED: bool = True
+    PROFILING_INTERVAL: float = 0.001
+    # Profile 1 in N requests to PROFILING_DIR, 0 disables sampling
+    PROFILING_SAMPLE_RATE: int = 0
+    PROFILING_DIR: str = "profiles"
+    PROFILING_MAX_FILES: int = 100
+
+    # Memory profiling (tracemalloc)
+    # Frames stored per allocation traceback, unless given when starting
+    MEMORY_TRACE_FRAMES: int = 1
+    MEMORY_MAX_SNAPSHOTS: int = 5
+
+    # Tracing (OpenTelemetry)
+    OTEL_ENABLED: bool = False
+    OTEL_SERVICE_NAME: str = "fastapi-api-template"
+    # Share of the traces started here that are recorded
+    OTEL_SAMPLE_RATE: float = 0.1
+    OTEL_EXPORTER: Literal["otlp", "file", "console"] = "otlp"
+    OTEL_EXPORTER_OTLP_TRACES_ENDPOINT: str = "http://localhost:4318/v1/traces"
+    OTEL_EXPORTER_FILE: str = "traces.jsonl"
 
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
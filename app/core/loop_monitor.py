@@ -0,0 +1,87 @@
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from types import FrameType
+from typing import Any
+
+from loguru import logger
+
+from app.core.config import settings
+from app.core.metrics import EVENT_LOOP_BLOCKS, EVENT_LOOP_LAG
+
+
+class LoopMonitor:
+    """
+    Detects callbacks blocking the event loop (e.g. sync I/O or bcrypt inside
+    an `async def` handler).
+
+    A heartbeat task wakes up every `LOOP_MONITOR_INTERVAL` seconds, recording
+    how late it ran (event loop lag). A watchdog thread checks the heartbeat;
+    when it is older than `LOOP_BLOCK_THRESHOLD` seconds, it logs the request
+    being served and the stack of the event loop thread, once per stall.
+    """
+
+    def __init__(self) -> None:
+        self._last_beat = time.monotonic()
+        self._reported_beat = 0.0
+        self._loop_thread_id: int | None = None
+
+    async def run(self) -> None:
+        """Beat until cancelled, with the watchdog running meanwhile."""
+        loop = asyncio.get_running_loop()
+        interval = settings.LOOP_MONITOR_INTERVAL
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        stop = threading.Event()
+        watchdog = threading.Thread(
+            target=self.watch, args=(stop,), name="loop-watchdog", daemon=True
+        )
+        watchdog.start()
+        try:
+            while True:
+                start = loop.time()
+                await asyncio.sleep(interval)
+                EVENT_LOOP_LAG.observe(max(0.0, loop.time() - start - interval))
+                self._last_beat = time.monotonic()
+        finally:
+            stop.set()
+
+    def watch(self, stop: threading.Event) -> None:
+        threshold = settings.LOOP_BLOCK_THRESHOLD
+        while not stop.wait(min(threshold / 2, settings.LOOP_MONITOR_INTERVAL)):
+            last_beat = self._last_beat
+            blocked = time.monotonic() - last_beat
+            if blocked > threshold and last_beat != self._reported_beat:
+                self._reported_beat = last_beat
+                self.report(blocked)
+
+    def report(self, blocked: float) -> None:
+        """Log what the event loop thread is running."""
+        EVENT_LOOP_BLOCKS.inc()
+        frame = sys._current_frames().get(self._loop_thread_id or 0)
+        if frame is None:
+            return
+
+        stack = "".join(traceback.format_stack(frame))
+        logger.warning(
+            f"Event loop blocked for {blocked * 1000:.0f} ms serving "
+            f"{self.current_request(frame) or 'no request'}:\n{stack}"
+        )
+
+    @staticmethod
+    def current_request(frame: FrameType | None) -> str | None:
+        """Method and route of the ASGI request found up the stack."""
+        while frame is not None:
+            scope: Any = frame.f_locals.get("scope")
+            if isinstance(scope, dict) and scope.get("type") == "http":
+                # Set by the router once the request is routed
+                route = scope.get("route")
+                path = getattr(route, "path", None) or scope.get("path")
+                return f"{scope.get('method')} {path}"
+            frame = frame.f_back
+        return None
+
+
+loop_monitor = LoopMonitor()
@@ -0,0 +1,140 @@
+import gc
+import itertools
+import os
+import threading
+import tracemalloc
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from typing import Any, Literal
+
+import psutil
+
+from app.core.config import settings
+
+GroupBy = Literal["lineno", "filename", "traceback"]
+
+# Allocations of tracemalloc itself and of the import machinery are noise
+SNAPSHOT_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+]
+
+
+class TracingNotStarted(Exception):
+    """Raised when taking a snapshot while tracemalloc is not tracing."""
+
+
+class SnapshotNotFound(Exception):
+    """Raised for snapshots never taken or already dropped."""
+
+
+@dataclass
+class StoredSnapshot:
+    id: int
+    taken_at: datetime
+    traced_memory: int
+    snapshot: tracemalloc.Snapshot
+
+
+def memory_stats() -> dict[str, Any]:
+    """RSS of the worker and objects tracked per garbage collector generation."""
+    memory = psutil.Process().memory_info()
+    return {
+        "pid": os.getpid(),
+        "rss": memory.rss,
+        "vms": memory.vms,
+        "gc": [
+            {"generation": generation, "objects": objects, **stats}
+            for generation, (objects, stats) in enumerate(
+                zip(gc.get_count(), gc.get_stats(), strict=False)
+            )
+        ],
+    }
+
+
+class MemoryProfiler:
+    """
+    tracemalloc snapshots of the worker, to find the code holding on to memory.
+
+    Tracing makes every allocation slower and keeps a trace per memory block,
+    start it only while investigating. The last `MEMORY_MAX_SNAPSHOTS`
+    snapshots are kept in the worker; with several workers, each has its own.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._snapshots: dict[int, StoredSnapshot] = {}
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    @property
+    def snapshots(self) -> list[StoredSnapshot]:
+        with self._lock:
+            return list(self._snapshots.values())
+
+    def start(self, frames: int) -> None:
+        """Start tracing, storing `frames` frames per allocation traceback."""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+
+    def stop(self) -> None:
+        """Stop tracing. Snapshots taken so far are kept."""
+        tracemalloc.stop()
+
+    def take_snapshot(self) -> StoredSnapshot:
+        if not tracemalloc.is_tracing():
+            raise TracingNotStarted()
+
+        snapshot = tracemalloc.take_snapshot().filter_traces(SNAPSHOT_FILTERS)
+        stored = StoredSnapshot(
+            id=next(self._ids),
+            taken_at=datetime.now(UTC),
+            traced_memory=tracemalloc.get_traced_memory()[0],
+            snapshot=snapshot,
+        )
+        with self._lock:
+            self._snapshots[stored.id] = stored
+            while len(self._snapshots) > settings.MEMORY_MAX_SNAPSHOTS:
+                del self._snapshots[min(self._snapshots)]
+        return stored
+
+    def get(self, snapshot_id: int) -> StoredSnapshot:
+        with self._lock:
+            stored = self._snapshots.get(snapshot_id)
+        if stored is None:
+            raise SnapshotNotFound(snapshot_id)
+        return stored
+
+    def previous(self, snapshot_id: int) -> StoredSnapshot:
+        """Snapshot taken before `snapshot_id`, the default base of diffs."""
+        with self._lock:
+            ids = [id_ for id_ in self._snapshots if id_ < snapshot_id]
+        if not ids:
+            raise SnapshotNotFound(snapshot_id - 1)
+        return self.get(max(ids))
+
+    def top(
+        self, snapshot_id: int, group_by: GroupBy, limit: int
+    ) -> list[tracemalloc.Statistic]:
+        """Biggest allocators of a snapshot."""
+        return self.get(snapshot_id).snapshot.statistics(group_by)[:limit]
+
+    def diff(
+        self, snapshot_id: int, base_id: int | None, group_by: GroupBy, limit: int
+    ) -> list[tracemalloc.StatisticDiff]:
+        """Allocators that grew (or shrank) the most since the base snapshot."""
+        stored = self.get(snapshot_id)
+        base = self.previous(snapshot_id) if base_id is None else self.get(base_id)
+        return stored.snapshot.compare_to(base.snapshot, group_by)[:limit]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._snapshots.clear()
+
+
+memory_profiler = MemoryProfiler()
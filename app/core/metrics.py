@@ -0,0 +1,166 @@
+import asyncio
+import os
+from typing import Any
+
+from prometheus_client import (
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+from app.core.config import settings
+from app.core.memory import memory_stats
+from app.db.database import pool_stats
+from app.utils import password_hasher
+
+# With several workers, `PROMETHEUS_MULTIPROC_DIR` must point to an empty
+# directory shared by them (see scripts/start.sh). Gauges are summed over the
+# live workers.
+
+REQUESTS = Counter(
+    "http_requests_total", "HTTP requests", ["method", "route", "status"]
+)
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "HTTP requests being served",
+    multiprocess_mode="livesum",
+)
+RATE_LIMITED = Counter(
+    "http_rate_limited_requests_total", "Requests rejected by the rate limiter"
+)
+LOAD_SHED = Counter(
+    "http_load_shed_requests_total",
+    "Requests rejected by load shedding",
+    ["route_class"],
+)
+
+CACHE_LOOKUPS = Counter(
+    "cache_lookups_total", "Cache lookups by result", ["cache", "result"]
+)
+
+DB_POOL_CONNECTIONS = Gauge(
+    "db_pool_connections",
+    "Connections of the database pool",
+    ["state"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_CHECKOUTS = Counter("db_pool_checkouts_total", "Database pool checkouts")
+DB_POOL_TIMEOUTS = Counter("db_pool_timeouts_total", "Database pool checkout timeouts")
+DB_POOL_WAIT = Counter(
+    "db_pool_wait_seconds_total", "Time spent waiting for a pool connection"
+)
+
+BCRYPT_QUEUE_DEPTH = Gauge(
+    "bcrypt_queue_depth",
+    "Password hashes waiting for a bcrypt worker",
+    multiprocess_mode="livesum",
+)
+WORKER_RSS = Gauge(
+    "worker_rss_bytes", "Resident set size of the worker", multiprocess_mode="liveall"
+)
+GC_OBJECTS = Gauge(
+    "worker_gc_objects",
+    "Objects tracked by the garbage collector since its last collection",
+    ["generation"],
+    multiprocess_mode="liveall",
+)
+GC_COLLECTIONS = Counter(
+    "worker_gc_collections_total",
+    "Garbage collections per generation",
+    ["generation"],
+)
+GC_UNCOLLECTABLE = Counter(
+    "worker_gc_uncollectable_objects_total",
+    "Objects found uncollectable by the garbage collector",
+    ["generation"],
+)
+
+EVENT_LOOP_LAG = Histogram(
+    "event_loop_lag_seconds",
+    "Delay of the event loop waking up a sleeping task",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0),
+)
+EVENT_LOOP_BLOCKS = Counter(
+    "event_loop_blocks_total",
+    "Times the event loop was blocked over LOOP_BLOCK_THRESHOLD",
+)
+
+
+def render() -> bytes:
+    """Metrics in the Prometheus text format, of every worker if multiprocess."""
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)  # type: ignore[no-untyped-call]
+        return generate_latest(registry)
+    return generate_latest(REGISTRY)
+
+
+def mark_process_dead() -> None:
+    """Drop the live gauges of this worker on shutdown."""
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        multiprocess.mark_process_dead(os.getpid())  # type: ignore[no-untyped-call]
+
+
+class RuntimeMetrics:
+    """
+    Samples the worker state that is not event driven (pool, bcrypt queue,
+    memory and garbage collector) every `METRICS_SAMPLE_INTERVAL` seconds.
+    The event loop lag is recorded by the loop monitor.
+    """
+
+    def __init__(self) -> None:
+        self._last_pool_stats: dict[str, Any] = {}
+        self._last_gc_stats: dict[int, dict[str, int]] = {}
+
+    def sample(self) -> None:
+        BCRYPT_QUEUE_DEPTH.set(password_hasher.queued)
+        self.sample_memory()
+
+        stats = pool_stats()
+        if stats is None:
+            return
+        for state in ("size", "checked_out", "overflow"):
+            DB_POOL_CONNECTIONS.labels(state).set(stats[state])
+
+        # The pool keeps running totals, counters get the increase
+        last = self._last_pool_stats
+        DB_POOL_CHECKOUTS.inc(stats["checkouts"] - last.get("checkouts", 0))
+        DB_POOL_TIMEOUTS.inc(stats["timeouts"] - last.get("timeouts", 0))
+        DB_POOL_WAIT.inc(
+            stats["wait_seconds_total"] - last.get("wait_seconds_total", 0.0)
+        )
+        self._last_pool_stats = stats
+
+    def sample_memory(self) -> None:
+        stats = memory_stats()
+        WORKER_RSS.set(stats["rss"])
+        for generation in stats["gc"]:
+            label = str(generation["generation"])
+            last = self._last_gc_stats.get(generation["generation"], {})
+            GC_OBJECTS.labels(label).set(generation["objects"])
+            GC_COLLECTIONS.labels(label).inc(
+                generation["collections"] - last.get("collections", 0)
+            )
+            GC_UNCOLLECTABLE.labels(label).inc(
+                generation["uncollectable"] - last.get("uncollectable", 0)
+            )
+            self._last_gc_stats[generation["generation"]] = generation
+
+    async def run(self) -> None:
+        """Sample periodically until cancelled."""
+        while True:
+            await asyncio.sleep(settings.METRICS_SAMPLE_INTERVAL)
+            self.sample()
+
+
+runtime_metrics = RuntimeMetrics()
@@ -3,17 +3,24 @@ from typing import Annotated, Any, cast
 
 from authlib.integrations.starlette_client import OAuth
 from authlib.jose import jwt as jwt
+from authlib.jose.errors import InvalidClaimError
 from authlib.jose.errors import JoseError as JoseError
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from loguru import logger
 from pydantic import ValidationError
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
+from app.core.timing import measure, timed
+from app.core.tracing import start_span
 from app.db.database import get_db
 from app.models import User
-from app.schemas import TokenData
+from app.schemas import Principal, TokenData
+from app.services.cache import CacheService
+from app.services.token_cache import token_cache
+from app.services.user_cache import user_cache
 
 SECRET_KEY = settings.SECRET_KEY
 ALGORITHM = settings.ALGORITHM
@@ -34,34 +41,171 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login
 
 def create_access_token(data: dict[str, Any]) -> str:
     to_encode = data.copy()
-    expire = datetime.now(UTC) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
+    now = datetime.now(UTC)
+    expire = now + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    to_encode.update({"exp": expire, "iat": now, "ver": settings.TOKEN_VERSION})
     encoded_jwt = jwt.encode(
         payload=to_encode, key=SECRET_KEY, header={"alg": ALGORITHM}
     )
     return cast(bytes, encoded_jwt).decode("utf-8")
 
 
-def get_current_user(
-    token: Annotated[str, Depends(oauth2_scheme)], db: Session = Depends(get_db)
-) -> User:
-    credentials_exception = HTTPException(
+def credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+
+def verify_token(token: str) -> dict[str, Any]:
+    """
+    Verify an access token (signature, expiration and version) and return its
+    claims. Tokens verified before skip the signature check until they expire.
+    """
+    payload = token_cache.get(token)
+    if payload is None:
+        with start_span("jwt.decode"):
+            payload = jwt.decode(token, SECRET_KEY)
+            payload.validate()
+        # Tokens created before `ver` was added count as version 1
+        if payload.get("ver", 1) != settings.TOKEN_VERSION:
+            raise InvalidClaimError("ver")
+        token_cache.set(token, payload)
+    return cast(dict[str, Any], payload)
+
+
+def get_current_user(
+    token: Annotated[str, Depends(oauth2_scheme)], db: Session = Depends(get_db)
+) -> User:
     try:
-        payload = jwt.decode(token, SECRET_KEY)
-        payload.validate()
+        with measure("auth"):
+            payload = verify_token(token)
         sub: int | None = payload.get("sub", None)
         if sub is None:
-            raise credentials_exception
+            raise credentials_exception()
         token_data = TokenData(id=sub)
     except (JoseError, ValidationError) as exc:
-        raise credentials_exception from exc
+        raise credentials_exception() from exc
 
-    stmt_select = select(User).where(User.id == token_data.id)
-    user = db.execute(stmt_select).scalars().first()
-    if user is None:
-        raise credentials_exception
+    if settings.TOKEN_REVOCATION_ENABLED:
+        with measure("auth"):
+            if is_token_revoked_sync(payload):
+                raise credentials_exception()
+
+    # Lets the session know whose writes it commits (read-your-writes)
+    db.info["user_id"] = token_data.id
+
+    with measure("auth"):
+        # Cached users skip the database lookup
+        if token_data.id is not None and (cached := user_cache.get(token_data.id, db)):
+            return cached
+
+        stmt_select = select(User).where(User.id == token_data.id)
+        user = db.execute(stmt_select).scalars().first()
+        if user is None:
+            raise credentials_exception()
+        user_cache.set(user)
     return user
+
+
+async def get_current_principal(
+    token: Annotated[str, Depends(oauth2_scheme)],
+) -> Principal:
+    """
+    Lightweight alternative to `get_current_user` built from the token claims,
+    it does not query the users table.
+    """
+    try:
+        with measure("auth"):
+            payload = verify_token(token)
+        principal = Principal(
+            id=payload.get("sub"),
+            email=payload.get("email"),
+            issued_at=payload.get("iat"),
+            token_version=payload.get("ver", 1),
+        )
+    except (JoseError, ValidationError) as exc:
+        raise credentials_exception() from exc
+
+    if settings.TOKEN_REVOCATION_ENABLED and await is_token_revoked(payload):
+        raise credentials_exception()
+    return principal
+
+
+def generation_key(user_id: int) -> str:
+    return f"auth:generation:{user_id}"
+
+
+async def revoke_tokens(user_id: int) -> None:
+    """
+    Revoke the tokens issued to a user so far (`TOKEN_REVOCATION_ENABLED`) by
+    bumping their token generation: tokens carry the generation current when
+    they were issued (`gen` claim) and older generations are rejected.
+    """
+    async with CacheService.redis_client.pipeline(transaction=True) as pipe:
+        pipe.incr(generation_key(user_id))
+        pipe.expire(generation_key(user_id), ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+        await pipe.execute()
+
+
+async def token_generation(user_id: int) -> int:
+    """
+    Token generation of a user, for the `gen` claim of new tokens. Its TTL is
+    extended so it outlives them, once it expires every token of an older
+    generation has expired too.
+    """
+    try:
+        generation = await CacheService.redis_client.getex(
+            generation_key(user_id), ex=ACCESS_TOKEN_EXPIRE_MINUTES * 60
+        )
+    except Exception as e:
+        logger.error(f"Error reading token generation (user {user_id}): {e}")
+        return 0
+    return int(generation or 0)
+
+
+def is_older_generation(claims: dict[str, Any], generation: Any) -> bool:
+    """Check whether the token was issued before its user revoked them."""
+    return int(claims.get("gen", 0)) < int(generation or 0)
+
+
+@timed("auth")
+async def is_token_revoked(claims: dict[str, Any]) -> bool:
+    """Check the claims of a verified token against the revoked tokens."""
+    user_id = int(claims["sub"])
+    try:
+        generation = await CacheService.redis_client.get(generation_key(user_id))
+    except Exception as e:
+        # Fail open, tokens are still verified and expire
+        logger.error(f"Error checking revoked tokens (user {user_id}): {e}")
+        return False
+    return is_older_generation(claims, generation)
+
+
+def is_token_revoked_sync(claims: dict[str, Any]) -> bool:
+    """`is_token_revoked` for sync dependencies, with a blocking Redis client."""
+    user_id = int(claims["sub"])
+    try:
+        generation = user_cache.redis_client.get(generation_key(user_id))
+    except Exception as e:
+        logger.error(f"Error checking revoked tokens (user {user_id}): {e}")
+        return False
+    return is_older_generation(claims, generation)
+
+
+def is_admin(user_id: int | None) -> bool:
+    """Check whether a user is listed in `ADMIN_USER_IDS`."""
+    return user_id is not None and user_id in settings.ADMIN_USER_IDS
+
+
+async def get_admin_principal(
+    principal: Annotated[Principal, Depends(get_current_principal)],
+) -> Principal:
+    """Like `get_current_principal`, for admins only."""
+    if not is_admin(principal.id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to perform requested action",
+        )
+    return principal
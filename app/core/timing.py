@@ -0,0 +1,67 @@
+import functools
+import time
+from collections import defaultdict
+from collections.abc import Awaitable, Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import ParamSpec, TypeVar
+
+P = ParamSpec("P")
+R = TypeVar("R")
+
+
+@dataclass
+class RequestTimings:
+    """Time spent by a request in each segment (db, cache, auth), in seconds."""
+
+    route: str | None = None
+    db_queries: int = 0
+    segments: defaultdict[str, float] = field(
+        default_factory=lambda: defaultdict(float)
+    )
+
+    def add(self, segment: str, seconds: float) -> None:
+        self.segments[segment] += seconds
+
+    def add_query(self, seconds: float) -> None:
+        self.db_queries += 1
+        self.add("db", seconds)
+
+
+# Timings of the current request, set by `ServerTimingMiddleware`. Threadpool
+# calls get a copy of the context, which shares the same `RequestTimings`.
+request_timings: ContextVar[RequestTimings | None] = ContextVar(
+    "request_timings", default=None
+)
+
+
+@contextmanager
+def measure(segment: str) -> Iterator[None]:
+    """Add the time spent in the block to a segment of the current request."""
+    timings = request_timings.get()
+    if timings is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(segment, time.perf_counter() - start)
+
+
+def timed(
+    segment: str,
+) -> Callable[[Callable[P, Awaitable[R]]], Callable[P, Awaitable[R]]]:
+    """Decorator version of `measure` for coroutine functions."""
+
+    def decorator(func: Callable[P, Awaitable[R]]) -> Callable[P, Awaitable[R]]:
+        @functools.wraps(func)
+        async def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+            with measure(segment):
+                return await func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
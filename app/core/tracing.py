@@ -0,0 +1,93 @@
+import functools
+import os
+from collections.abc import Awaitable, Callable, Iterator
+from contextlib import contextmanager
+from typing import Any, ParamSpec, TypeVar
+
+from opentelemetry import trace
+from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import ReadableSpan, TracerProvider
+from opentelemetry.sdk.trace.export import (
+    BatchSpanProcessor,
+    ConsoleSpanExporter,
+    SpanExporter,
+)
+from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+from opentelemetry.trace import Span
+
+from app.core.config import settings
+
+P = ParamSpec("P")
+R = TypeVar("R")
+
+# Spans are only recorded once `setup_tracing` installs a provider
+tracer = trace.get_tracer("app")
+
+
+def setup_tracing() -> TracerProvider | None:
+    """
+    Install the tracer provider when `OTEL_ENABLED`, sampling
+    `OTEL_SAMPLE_RATE` of the traces (child spans follow their parent).
+    """
+    if not settings.OTEL_ENABLED:
+        return None
+
+    provider = TracerProvider(
+        resource=Resource.create(
+            {
+                "service.name": settings.OTEL_SERVICE_NAME,
+                "service.version": settings.VERSION,
+                "deployment.environment.name": settings.ENVIRONMENT,
+            }
+        ),
+        sampler=ParentBased(TraceIdRatioBased(settings.OTEL_SAMPLE_RATE)),
+    )
+    provider.add_span_processor(BatchSpanProcessor(span_exporter()))
+    trace.set_tracer_provider(provider)
+    return provider
+
+
+def span_exporter() -> SpanExporter:
+    """Exporter selected by `OTEL_EXPORTER`."""
+    if settings.OTEL_EXPORTER == "otlp":
+        return OTLPSpanExporter(endpoint=settings.OTEL_EXPORTER_OTLP_TRACES_ENDPOINT)
+
+    if settings.OTEL_EXPORTER == "file":
+        # One JSON span per line
+        def formatter(span: ReadableSpan) -> str:
+            return str(span.to_json(indent=None)) + os.linesep
+
+        return ConsoleSpanExporter(
+            out=open(settings.OTEL_EXPORTER_FILE, "a"),
+            formatter=formatter,
+        )
+
+    return ConsoleSpanExporter()
+
+
+@contextmanager
+def start_span(name: str, **attributes: Any) -> Iterator[Span | None]:
+    """Run the block in a child span of the current one, if tracing is enabled."""
+    if not settings.OTEL_ENABLED:
+        yield None
+        return
+
+    with tracer.start_as_current_span(name, attributes=attributes) as span:
+        yield span
+
+
+def traced(
+    name: str,
+) -> Callable[[Callable[P, Awaitable[R]]], Callable[P, Awaitable[R]]]:
+    """Decorator version of `start_span` for coroutine functions."""
+
+    def decorator(func: Callable[P, Awaitable[R]]) -> Callable[P, Awaitable[R]]:
+        @functools.wraps(func)
+        async def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+            with start_span(name):
+                return await func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -3,10 +3,44 @@ from typing import Any
 
 from sqlalchemy import create_engine
 from sqlalchemy.orm import DeclarativeBase, Session, sessionmaker
+from sqlalchemy.pool import NullPool
 
-from app.core.config import settings
+from app.core.config import Settings, settings
+from app.db.pool import InstrumentedQueuePool
 
-engine = create_engine(settings.SQLALCHEMY_DATABASE_URI.unicode_string())
+
+def engine_options(config: Settings = settings) -> dict[str, Any]:
+    """
+    Keyword arguments for `create_engine`, from the `DB_*` settings.
+
+    With `DB_POOL_DISABLED` (e.g. behind PgBouncer) every session opens its own
+    connection. Otherwise each worker keeps a pool; when `DB_MAX_CONNECTIONS`
+    is set it is split between the `WEB_CONCURRENCY` workers.
+    """
+    if config.DB_POOL_DISABLED:
+        # Server-side prepared statements do not survive transaction pooling
+        return {"poolclass": NullPool, "connect_args": {"prepare_threshold": None}}
+
+    pool_size = config.DB_POOL_SIZE
+    max_overflow = config.DB_MAX_OVERFLOW
+    if config.DB_MAX_CONNECTIONS:
+        per_worker = max(1, config.DB_MAX_CONNECTIONS // config.WEB_CONCURRENCY)
+        pool_size = min(pool_size, per_worker)
+        max_overflow = min(max_overflow, per_worker - pool_size)
+
+    return {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout": config.DB_POOL_TIMEOUT,
+        "pool_recycle": config.DB_POOL_RECYCLE,
+        "pool_pre_ping": config.DB_POOL_PRE_PING,
+    }
+
+
+engine = create_engine(
+    settings.SQLALCHEMY_DATABASE_URI.unicode_string(), **engine_options()
+)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -21,3 +55,10 @@ def get_db() -> Generator[Session, Any]:
         yield db
     finally:
         db.close()
+
+
+def pool_stats() -> dict[str, Any] | None:
+    """Usage of the connection pool of this worker, None if pooling is disabled."""
+    if isinstance(engine.pool, InstrumentedQueuePool):
+        return engine.pool.stats()
+    return None
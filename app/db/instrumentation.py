@@ -0,0 +1,168 @@
+import random
+import time
+from collections.abc import Sequence
+from typing import Any
+
+from loguru import logger
+from opentelemetry.trace import SpanKind, Status, StatusCode
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine, ExceptionContext, ExecutionContext
+from sqlalchemy.engine.interfaces import DBAPICursor
+
+from app.core.config import settings
+from app.core.timing import request_timings
+from app.core.tracing import tracer
+from app.models.encrypted import Encrypted
+
+REDACTED = "<redacted>"
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def start_query_timer(
+    conn: Connection, _cursor: DBAPICursor, statement: str, *_args: Any
+) -> None:
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    if settings.OTEL_ENABLED:
+        span = tracer.start_span(
+            statement.split(None, 1)[0].upper(),
+            kind=SpanKind.CLIENT,
+            attributes={
+                "db.system.name": conn.dialect.name,
+                "db.query.text": statement,
+            },
+        )
+        conn.info.setdefault("query_span", []).append(span)
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def record_query_time(
+    conn: Connection,
+    cursor: DBAPICursor,
+    statement: str,
+    parameters: Any,
+    context: ExecutionContext,
+    executemany: bool,
+) -> None:
+    """
+    Count the query and its duration in the timings of the current request
+    (ending its span), and log it when slower than `SLOW_QUERY_THRESHOLD`.
+    """
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    if spans := conn.info.get("query_span"):
+        spans.pop().end()
+    timings = request_timings.get()
+    if timings is not None:
+        timings.add_query(elapsed)
+
+    if settings.SLOW_QUERY_THRESHOLD and elapsed >= settings.SLOW_QUERY_THRESHOLD:
+        log_slow_query(
+            conn, cursor, statement, parameters, context, executemany, elapsed
+        )
+
+
+@event.listens_for(Engine, "handle_error")
+def discard_query_timer(context: ExceptionContext) -> None:
+    # Failed queries do not reach `after_cursor_execute`
+    if context.execution_context is not None and context.connection is not None:
+        if starts := context.connection.info.get("query_start"):
+            starts.pop()
+        if spans := context.connection.info.get("query_span"):
+            span = spans.pop()
+            span.record_exception(context.original_exception)
+            span.set_status(Status(StatusCode.ERROR))
+            span.end()
+
+
+def log_slow_query(
+    conn: Connection,
+    cursor: DBAPICursor,
+    statement: str,
+    parameters: Any,
+    context: ExecutionContext,
+    executemany: bool,
+    elapsed: float,
+) -> None:
+    """
+    Log a slow statement with its parameters and route. A sample
+    (`SLOW_QUERY_EXPLAIN_SAMPLE_RATE`) of the slow SELECTs include their plan.
+    """
+    timings = request_timings.get()
+    route = timings.route if timings is not None else None
+    params = redact_parameters(context, parameters, executemany)
+    message = (
+        f"Slow query ({elapsed * 1000:.1f} ms) on {route or 'no route'}: "
+        f"{statement} | parameters: {params}"
+    )
+
+    if (
+        not executemany
+        and conn.dialect.name == "postgresql"
+        and statement.lstrip()[:6].upper() == "SELECT"
+        and random.random() < settings.SLOW_QUERY_EXPLAIN_SAMPLE_RATE
+    ):
+        plan = explain(cursor, statement, parameters)
+        if plan:
+            message += f"\n{plan}"
+
+    logger.warning(message)
+
+
+def redact_parameters(
+    context: ExecutionContext, parameters: Any, executemany: bool
+) -> Any:
+    """Replace the values bound to `Encrypted` columns."""
+    # Only SQL statements have binds (not DDL or raw driver SQL)
+    compiled = getattr(context, "compiled", None)
+    bind_names = getattr(compiled, "bind_names", None)
+    if compiled is None or not bind_names:
+        return parameters
+
+    secret = {
+        name for bind, name in bind_names.items() if isinstance(bind.type, Encrypted)
+    }
+    if not secret:
+        return parameters
+
+    def redact(params: Any) -> Any:
+        if isinstance(params, dict):
+            # Batched inserts suffix the names ("name__0", "name__1", ...)
+            return {
+                key: REDACTED if key.rsplit("__", 1)[0] in secret else value
+                for key, value in params.items()
+            }
+        names: Sequence[str] = compiled.positiontup or ()
+        if len(names) != len(params):
+            return [REDACTED] * len(params)
+        return tuple(
+            REDACTED if name in secret else value
+            for name, value in zip(names, params, strict=True)
+        )
+
+    if executemany:
+        return [redact(params) for params in parameters]
+    return redact(parameters)
+
+
+def explain(cursor: DBAPICursor, statement: str, parameters: Any) -> str | None:
+    """
+    Plan of a statement run again with `EXPLAIN (ANALYZE, BUFFERS)` on the same
+    connection, inside a savepoint so a failure does not abort the transaction.
+    """
+    explain_cursor = cursor.connection.cursor()
+    try:
+        explain_cursor.execute("SAVEPOINT slow_query_explain")
+        try:
+            explain_cursor.execute(
+                f"EXPLAIN (ANALYZE, BUFFERS) {statement}", parameters
+            )
+            plan = "\n".join(row[0] for row in explain_cursor.fetchall())
+        finally:
+            explain_cursor.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+            explain_cursor.execute("RELEASE SAVEPOINT slow_query_explain")
+        return plan
+    except Exception as e:
+        logger.error(f"Error explaining slow query: {e}")
+        return None
+    finally:
+        explain_cursor.close()
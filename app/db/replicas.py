@@ -0,0 +1,179 @@
+import asyncio
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+from loguru import logger
+from redis import Redis
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import ORMExecuteState, Session, sessionmaker
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.db.database import engine_options
+
+
+class ReplicaRouter:
+    """
+    Read replica engines (`DB_REPLICA_URLS`) picked round-robin.
+
+    Replicas that fail a health check (or a request) are skipped for
+    `DB_REPLICA_RETRY_AFTER` seconds. When none is healthy, reads go to the
+    primary.
+    """
+
+    def __init__(self, urls: list[str]) -> None:
+        self.engines = [create_engine(url, **engine_options()) for url in urls]
+        self.sessionmakers = [
+            sessionmaker(autocommit=False, autoflush=False, bind=engine)
+            for engine in self.engines
+        ]
+        self._unhealthy_until: dict[int, float] = {}
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.engines)
+
+    def session(self) -> Session | None:
+        """Open a session on the next healthy replica. None if there is none."""
+        now = time.monotonic()
+        with self._lock:
+            for _ in range(len(self.engines)):
+                index = next(self._counter) % len(self.engines)
+                if self._unhealthy_until.get(index, 0) <= now:
+                    break
+            else:
+                return None
+
+        db = self.sessionmakers[index]()
+        db.info["replica"] = index
+        return db
+
+    def mark_unhealthy(self, index: int) -> None:
+        with self._lock:
+            self._unhealthy_until[index] = (
+                time.monotonic() + settings.DB_REPLICA_RETRY_AFTER
+            )
+        logger.warning(f"Read replica {index} marked as unhealthy")
+
+    def mark_healthy(self, index: int) -> None:
+        with self._lock:
+            if self._unhealthy_until.pop(index, None) is not None:
+                logger.info(f"Read replica {index} is healthy again")
+
+    def check(self) -> None:
+        """Ping every replica, updating its health."""
+        for index, engine in enumerate(self.engines):
+            try:
+                with engine.connect() as connection:
+                    connection.execute(text("SELECT 1"))
+                self.mark_healthy(index)
+            except Exception as e:
+                logger.error(f"Read replica {index} health check failed: {e}")
+                self.mark_unhealthy(index)
+
+    async def run(self) -> None:
+        """Check the replicas periodically until cancelled."""
+        while True:
+            await run_in_threadpool(self.check)
+            await asyncio.sleep(settings.DB_REPLICA_CHECK_INTERVAL)
+
+
+class RecentWrites:
+    """
+    Users that committed a write in the last `DB_READ_YOUR_WRITES_WINDOW`
+    seconds, whose reads must go to the primary to see their own writes.
+    Kept in process and in Redis (`db:wrote:{user_id}`) for the other workers.
+    The in-process entries are kept in expiry order and pruned on writes.
+    """
+
+    redis_client: Redis = Redis(
+        host=settings.REDIS_HOSTNAME,
+        port=settings.REDIS_PORT,
+        decode_responses=True,
+        socket_timeout=1,
+    )
+
+    def __init__(self) -> None:
+        self.redis = self.redis_client
+        self._local: OrderedDict[int, float] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(user_id: int) -> str:
+        return f"db:wrote:{user_id}"
+
+    def record(self, user_id: int) -> None:
+        window = settings.DB_READ_YOUR_WRITES_WINDOW
+        now = time.monotonic()
+        with self._lock:
+            self._local[user_id] = now + window
+            self._local.move_to_end(user_id)
+            # The window is the same for everyone, the oldest entries expire first
+            while self._local:
+                oldest, until = next(iter(self._local.items()))
+                if until > now:
+                    break
+                del self._local[oldest]
+        try:
+            self.redis.set(self.key(user_id), 1, px=int(window * 1000))
+        except Exception as e:
+            logger.error(f"Error recording write of user {user_id}: {e}")
+
+    def wrote_recently(self, user_id: int) -> bool:
+        until = self._local.get(user_id)
+        if until is not None:
+            if until > time.monotonic():
+                return True
+            with self._lock:
+                if self._local.get(user_id, 0.0) <= time.monotonic():
+                    self._local.pop(user_id, None)
+
+        try:
+            return bool(self.redis.exists(self.key(user_id)))
+        except Exception as e:
+            logger.error(f"Error checking writes of user {user_id}: {e}")
+            # Read from the primary when unsure
+            return True
+
+    def clear_local(self) -> None:
+        """Forget the writes recorded in this process."""
+        with self._lock:
+            self._local.clear()
+
+
+replicas = ReplicaRouter(settings.DB_REPLICA_URLS)
+recent_writes = RecentWrites()
+
+
+@event.listens_for(Session, "after_flush")
+def mark_flush_write(session: Session, _flush_context: Any) -> None:
+    session.info["wrote"] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def mark_statement_write(orm_execute_state: ORMExecuteState) -> None:
+    if (
+        orm_execute_state.is_insert
+        or orm_execute_state.is_update
+        or orm_execute_state.is_delete
+    ):
+        orm_execute_state.session.info["wrote"] = True
+
+
+@event.listens_for(Session, "after_rollback")
+def clear_write(session: Session) -> None:
+    session.info.pop("wrote", None)
+
+
+@event.listens_for(Session, "after_commit")
+def record_user_write(session: Session) -> None:
+    """Send the reads of a user to the primary for a while after their write."""
+    wrote = session.info.pop("wrote", False)
+    user_id = session.info.get("user_id")
+    if wrote and user_id is not None and replicas.enabled:
+        recent_writes.record(user_id)
@@ -1,3 +1,8 @@
+import asyncio
+import contextlib
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.responses import JSONResponse, RedirectResponse
 from loguru import logger
@@ -6,11 +11,60 @@ from starlette.middleware.sessions import SessionMiddleware
 
 from app.api.api_v1.api import api_router
 from app.api.health import router as health_router
+from app.api.metrics import router as metrics_router
 from app.core.config import settings
-from app.middlewares import ProcessTimeHeaderMiddleware
+from app.core.loop_monitor import loop_monitor
+from app.core.metrics import mark_process_dead, runtime_metrics
+from app.core.tracing import setup_tracing
+from app.db import instrumentation  # noqa: F401  (query timings and slow log)
+from app.db.replicas import replicas
+from app.middlewares import (
+    LoadSheddingMiddleware,
+    MetricsMiddleware,
+    ProcessTimeHeaderMiddleware,
+    ProfilingMiddleware,
+    RateLimitMiddleware,
+    ServerTimingMiddleware,
+    TracingMiddleware,
+)
+from app.services.vote_buffer import vote_buffer
 
 from .logger import setup_logging
 
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    # Background tasks
+    tasks: list[asyncio.Task[None]] = []
+    if settings.VOTES_WRITE_BEHIND:
+        tasks.append(asyncio.create_task(vote_buffer.run()))
+    if replicas.enabled:
+        tasks.append(asyncio.create_task(replicas.run()))
+    if settings.METRICS_ENABLED:
+        tasks.append(asyncio.create_task(runtime_metrics.run()))
+    if settings.LOOP_MONITOR_ENABLED:
+        tasks.append(asyncio.create_task(loop_monitor.run()))
+
+    yield
+
+    for task in tasks:
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+
+    if settings.VOTES_WRITE_BEHIND:
+        try:
+            await vote_buffer.flush()
+        except Exception as e:
+            logger.error(f"Error flushing buffered votes on shutdown: {e}")
+
+    if settings.METRICS_ENABLED:
+        mark_process_dead()
+
+    if tracer_provider:
+        tracer_provider.shutdown()
+
+
 # FastAPI
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -18,13 +72,23 @@ app = FastAPI(
     summary=settings.SUMMARY,
     description=settings.DESCRIPTION,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    lifespan=lifespan,
 )
 
 # Logger
 setup_logging()
 
+# Tracing
+tracer_provider = setup_tracing()
+
 # Middlewares
+# Added first so they run inside CORS and 429/503 responses carry its headers
+app.add_middleware(RateLimitMiddleware)
+# Sheds load before rate limiting, which talks to Redis
+app.add_middleware(LoadSheddingMiddleware)
 app.add_middleware(SessionMiddleware, secret_key=settings.SECRET_KEY)
+# Inside CORS, so browsers can read the profiles
+app.add_middleware(ProfilingMiddleware)
 
 # Set all CORS enabled origins
 if settings.BACKEND_CORS_ORIGINS:
@@ -36,8 +100,12 @@ if settings.BACKEND_CORS_ORIGINS:
         allow_headers=["*"],
     )
 
-
+app.add_middleware(ServerTimingMiddleware)
 app.add_middleware(ProcessTimeHeaderMiddleware)
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+if settings.OTEL_ENABLED:
+    app.add_middleware(TracingMiddleware)
 
 
 @app.exception_handler(500)
@@ -49,6 +117,8 @@ async def handle_500_errors(exc: Exception) -> JSONResponse:
 # Routes
 app.include_router(api_router, prefix=settings.API_V1_STR)
 app.include_router(health_router, tags=["Health"])
+if settings.METRICS_ENABLED:
+    app.include_router(metrics_router)
 
 
 @app.get("/", include_in_schema=False)
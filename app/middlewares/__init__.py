@@ -1 +1,7 @@
+from .load_shedding import LoadSheddingMiddleware as LoadSheddingMiddleware
+from .metrics import MetricsMiddleware as MetricsMiddleware
 from .process_time import ProcessTimeHeaderMiddleware as ProcessTimeHeaderMiddleware
+from .profiling import ProfilingMiddleware as ProfilingMiddleware
+from .rate_limit import RateLimitMiddleware as RateLimitMiddleware
+from .server_timing import ServerTimingMiddleware as ServerTimingMiddleware
+from .tracing import TracingMiddleware as TracingMiddleware
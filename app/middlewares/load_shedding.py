@@ -0,0 +1,130 @@
+import asyncio
+import time
+from collections import deque
+
+from loguru import logger
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.metrics import LOAD_SHED
+from app.middlewares.routes import get_route_template
+
+
+class ConcurrencyLimit:
+    """
+    Caps the requests in flight, queueing up to `max_queue` of them in FIFO
+    order. A released slot is handed over directly to the next waiter.
+    """
+
+    def __init__(self, limit: int, max_queue: int) -> None:
+        self.limit = limit
+        self.max_queue = max_queue
+        self.active = 0
+        self._waiters: deque[asyncio.Future[None]] = deque()
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self, timeout: float) -> bool:
+        """Take a slot, waiting up to `timeout` seconds. False if not admitted."""
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            return True
+        if len(self._waiters) >= self.max_queue or timeout <= 0:
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        acquired = False
+        try:
+            await asyncio.wait_for(waiter, timeout)
+            acquired = True
+        except TimeoutError:
+            pass
+        finally:
+            if not acquired:
+                if waiter.done() and not waiter.cancelled():
+                    # The slot was handed over while timing out (or cancelled)
+                    self.release()
+                elif waiter in self._waiters:
+                    self._waiters.remove(waiter)
+        return acquired
+
+    def release(self) -> None:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+
+class LoadSheddingMiddleware:
+    """
+    Per worker admission control.
+
+    Caps the requests in flight globally (`LOAD_SHED_MAX_CONCURRENCY`) and per
+    route class (`LOAD_SHED_ROUTE_CLASSES`, e.g. bcrypt-heavy auth endpoints).
+    Requests over a cap wait in a bounded queue for at most
+    `LOAD_SHED_QUEUE_TIMEOUT` seconds, after that (or when the queue is full)
+    they get a 503 with `Retry-After`, so admitted requests keep a bounded
+    latency under overload.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self.global_limit = ConcurrencyLimit(
+            settings.LOAD_SHED_MAX_CONCURRENCY, settings.LOAD_SHED_MAX_QUEUE
+        )
+        self.class_limits = {
+            name: ConcurrencyLimit(limit, settings.LOAD_SHED_MAX_QUEUE)
+            for name, limit in settings.LOAD_SHED_CLASS_LIMITS.items()
+        }
+
+    def route_class(self, scope: Scope) -> str | None:
+        route = get_route_template(scope)
+        for name, routes in settings.LOAD_SHED_ROUTE_CLASSES.items():
+            if route in routes or f"{scope['method']} {route}" in routes:
+                return name
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not settings.LOAD_SHED_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        if get_route_template(scope) in settings.LOAD_SHED_EXEMPT_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        deadline = time.monotonic() + settings.LOAD_SHED_QUEUE_TIMEOUT
+        route_class = self.route_class(scope)
+        limits = [self.global_limit]
+        if route_class in self.class_limits:
+            limits.insert(0, self.class_limits[route_class])
+
+        acquired: list[ConcurrencyLimit] = []
+        try:
+            for limit in limits:
+                if not await limit.acquire(deadline - time.monotonic()):
+                    LOAD_SHED.labels(route_class or "default").inc()
+                    logger.warning(
+                        f"Shedding {scope['method']} {scope['path']} "
+                        f"(class {route_class or 'default'}, {limit.active} in "
+                        f"flight, {limit.queued} queued)"
+                    )
+                    response = JSONResponse(
+                        status_code=503,
+                        content={"detail": "Server overloaded, try again later"},
+                        headers={"Retry-After": str(settings.LOAD_SHED_RETRY_AFTER)},
+                    )
+                    await response(scope, receive, send)
+                    return
+                acquired.append(limit)
+
+            await self.app(scope, receive, send)
+        finally:
+            for limit in reversed(acquired):
+                limit.release()
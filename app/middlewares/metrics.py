@@ -0,0 +1,43 @@
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.metrics import REQUEST_DURATION, REQUESTS, REQUESTS_IN_FLIGHT
+from app.middlewares.routes import match_route_template
+
+
+class MetricsMiddleware:
+    """
+    Counts the requests and their latency per method, route template and
+    status. Paths that match no route share the `unmatched` label, to keep the
+    number of series bounded.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        route = match_route_template(scope) or "unmatched"
+        status = 500
+        start = time.perf_counter_ns()
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        REQUESTS_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+            labels = (scope["method"], route, str(status))
+            REQUESTS.labels(*labels).inc()
+            REQUEST_DURATION.labels(*labels).observe(
+                (time.perf_counter_ns() - start) / 1e9
+            )
@@ -0,0 +1,144 @@
+import itertools
+import re
+import time
+from datetime import UTC, datetime
+from pathlib import Path
+
+from loguru import logger
+from pyinstrument import Profiler
+from pyinstrument.renderers import SpeedscopeRenderer
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.responses import HTMLResponse, Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.oauth import is_admin, is_token_revoked, verify_token
+from app.middlewares.routes import get_route_template
+
+
+class ProfilingMiddleware:
+    """
+    Runs requests under the pyinstrument sampling profiler.
+
+    - On demand: admins (`ADMIN_USER_IDS`) sending `X-Profile: 1` get the
+      profile of their request instead of its response, as speedscope JSON
+      (`X-Profile: html` for the pyinstrument HTML report). The status of the
+      request is returned in `X-Profile-Status`.
+    - Sampled: 1 in `PROFILING_SAMPLE_RATE` requests are profiled to
+      `PROFILING_DIR` as speedscope JSON, keeping the last
+      `PROFILING_MAX_FILES` profiles.
+
+    Only the event loop thread is profiled, time spent by sync endpoints and
+    dependencies in the threadpool shows up as awaiting. One request at a
+    time is profiled per worker.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self._counter = itertools.count(1)
+        self._profiling = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not settings.PROFILING_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        output = headers.get("x-profile", "").lower()
+        on_demand = output not in ("", "0") and await self.is_admin_request(headers)
+        sampled = bool(
+            settings.PROFILING_SAMPLE_RATE
+            and next(self._counter) % settings.PROFILING_SAMPLE_RATE == 0
+        )
+        if not (on_demand or sampled) or self._profiling:
+            await self.app(scope, receive, send)
+            return
+
+        self._profiling = True
+        profiler = Profiler(interval=settings.PROFILING_INTERVAL)
+        try:
+            if on_demand:
+                await self.profile_on_demand(profiler, output, scope, receive, send)
+            else:
+                await self.profile_to_file(profiler, scope, receive, send)
+        finally:
+            self._profiling = False
+
+    async def profile_on_demand(
+        self,
+        profiler: Profiler,
+        output: str,
+        scope: Scope,
+        receive: Receive,
+        send: Send,
+    ) -> None:
+        status = 500
+
+        async def discard(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+
+        profiler.start()
+        try:
+            await self.app(scope, receive, discard)
+        finally:
+            profiler.stop()
+
+        # Status of the discarded response
+        headers = {"X-Profile-Status": str(status)}
+        response: Response
+        if output == "html":
+            response = HTMLResponse(profiler.output_html(), headers=headers)
+        else:
+            response = Response(
+                profiler.output(renderer=SpeedscopeRenderer()),
+                media_type="application/json",
+                headers=headers,
+            )
+        await response(scope, receive, send)
+
+    async def profile_to_file(
+        self, profiler: Profiler, scope: Scope, receive: Receive, send: Send
+    ) -> None:
+        start = time.perf_counter_ns()
+        profiler.start()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            profiler.stop()
+            elapsed_ms = (time.perf_counter_ns() - start) // 1_000_000
+            route = re.sub(r"[^\w-]+", "_", get_route_template(scope)).strip("_")
+            name = (
+                f"{datetime.now(UTC):%Y%m%dT%H%M%S%f}-{scope['method']}-"
+                f"{route or 'root'}-{elapsed_ms}ms.speedscope.json"
+            )
+            try:
+                await run_in_threadpool(self.save, name, profiler)
+            except Exception as e:
+                logger.error(f"Error saving profile {name}: {e}")
+
+    @staticmethod
+    def save(name: str, profiler: Profiler) -> None:
+        """Write a profile, dropping the oldest ones over `PROFILING_MAX_FILES`."""
+        directory = Path(settings.PROFILING_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        (directory / name).write_text(profiler.output(renderer=SpeedscopeRenderer()))
+
+        profiles = sorted(directory.glob("*.speedscope.json"))
+        for old in profiles[: max(0, len(profiles) - settings.PROFILING_MAX_FILES)]:
+            old.unlink(missing_ok=True)
+
+    @staticmethod
+    async def is_admin_request(headers: Headers) -> bool:
+        scheme, _, token = headers.get("authorization", "").partition(" ")
+        if scheme.lower() != "bearer" or not token:
+            return False
+        try:
+            claims = verify_token(token)
+            if settings.TOKEN_REVOCATION_ENABLED and await is_token_revoked(claims):
+                return False
+            return is_admin(int(claims["sub"]))
+        except Exception:
+            return False
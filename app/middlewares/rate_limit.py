@@ -0,0 +1,158 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from loguru import logger
+from redis.asyncio import Redis
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.metrics import RATE_LIMITED
+from app.core.oauth import verify_token
+from app.middlewares.routes import get_route_template
+
+# Takes one token from the bucket KEYS[1] (capacity ARGV[1], refilled at ARGV[2]
+# tokens per second). Returns {allowed (0/1), tokens left}.
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return {allowed, tostring(tokens)}
+"""
+
+
+class LocalTokenBuckets:
+    """In-process token buckets, used when Redis is unavailable."""
+
+    def __init__(self, maxsize: int = 10000) -> None:
+        self.maxsize = maxsize
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key: str, capacity: int, rate: float) -> tuple[bool, float]:
+        now = time.monotonic()
+        with self._lock:
+            tokens, ts = self._buckets.pop(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - ts) * rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.maxsize:
+                self._buckets.popitem(last=False)
+        return allowed, tokens
+
+
+class RateLimitMiddleware:
+    """
+    Token bucket rate limiting per client and route template.
+
+    Clients are identified by the user of a valid bearer token, or else by
+    their IP. Buckets live in Redis (`ratelimit:{client}:{method}:{route}`)
+    and are updated atomically by a Lua script. If Redis does not answer within
+    `RATE_LIMIT_REDIS_TIMEOUT`, each worker falls back to in-process buckets
+    and skips Redis for `RATE_LIMIT_REDIS_COOLDOWN` seconds, so an outage does
+    not slow down every request. Responses include the `RateLimit-Limit`,
+    `RateLimit-Remaining` and `RateLimit-Reset` headers, and rejected requests
+    get a 429 with `Retry-After`.
+    """
+
+    # Own client, the cache one waits on Redis as long as the socket allows
+    redis_client: Redis = Redis(
+        host=settings.REDIS_HOSTNAME,
+        port=settings.REDIS_PORT,
+        decode_responses=True,
+        socket_timeout=settings.RATE_LIMIT_REDIS_TIMEOUT,
+        socket_connect_timeout=settings.RATE_LIMIT_REDIS_TIMEOUT,
+    )
+    token_bucket_script = redis_client.register_script(TOKEN_BUCKET_SCRIPT)
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self.local_buckets = LocalTokenBuckets()
+        # Monotonic time until which Redis is skipped after an error
+        self.redis_retry_at = 0.0
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not settings.RATE_LIMIT_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        route = get_route_template(scope)
+        if route in settings.RATE_LIMIT_EXEMPT_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        capacity = settings.RATE_LIMIT_BURST
+        rate = settings.RATE_LIMIT_PER_SECOND
+        key = f"ratelimit:{self.client_id(scope)}:{scope['method']}:{route}"
+        allowed, tokens = await self.take(key, capacity, rate)
+
+        rate_headers = {
+            "RateLimit-Limit": str(capacity),
+            "RateLimit-Remaining": str(math.floor(tokens)),
+            "RateLimit-Reset": str(math.ceil((capacity - tokens) / rate)),
+        }
+
+        if not allowed:
+            RATE_LIMITED.inc()
+            retry_after = str(math.ceil((1 - tokens) / rate))
+            response = JSONResponse(
+                status_code=429,
+                content={"detail": "Too many requests"},
+                headers={**rate_headers, "Retry-After": retry_after},
+            )
+            await response(scope, receive, send)
+            return
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                for name, value in rate_headers.items():
+                    headers[name] = value
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+    @staticmethod
+    def client_id(scope: Scope) -> str:
+        authorization = Headers(scope=scope).get("authorization", "")
+        scheme, _, token = authorization.partition(" ")
+        if scheme.lower() == "bearer" and token:
+            try:
+                sub = verify_token(token).get("sub")
+                if sub is not None:
+                    return f"user:{sub}"
+            except Exception:
+                # Invalid tokens are rejected later, limit them by IP
+                pass
+        client = scope.get("client")
+        return f"ip:{client[0] if client else 'unknown'}"
+
+    async def take(self, key: str, capacity: int, rate: float) -> tuple[bool, float]:
+        if time.monotonic() < self.redis_retry_at:
+            return self.local_buckets.take(key, capacity, rate)
+        try:
+            allowed, tokens = await self.token_bucket_script(
+                keys=[key], args=[capacity, rate]
+            )
+            return bool(allowed), float(tokens)
+        except Exception as e:
+            logger.error(f"Error in rate limiter, using local buckets: {e}")
+            self.redis_retry_at = time.monotonic() + settings.RATE_LIMIT_REDIS_COOLDOWN
+            return self.local_buckets.take(key, capacity, rate)
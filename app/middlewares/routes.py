@@ -0,0 +1,34 @@
+import re
+from functools import cache
+
+from fastapi import FastAPI
+from starlette.routing import compile_path
+from starlette.types import Scope
+
+
+@cache
+def route_patterns(app: FastAPI) -> list[tuple[re.Pattern[str], str]]:
+    """Compiled path templates of the app routes, in routing order."""
+    return [(compile_path(path)[0], path) for path in app.openapi().get("paths", {})]
+
+
+def match_route_template(scope: Scope) -> str | None:
+    """
+    Resolve the route template of a request (e.g. `/api/v1/posts/{id}`) before
+    routing, so middlewares can group requests by endpoint. None when no
+    documented route matches.
+    """
+    app = scope.get("app")
+    if not isinstance(app, FastAPI):
+        return None
+
+    path = str(scope["path"])
+    for path_regex, template in route_patterns(app):
+        if path_regex.match(path):
+            return template
+    return None
+
+
+def get_route_template(scope: Scope) -> str:
+    """Like `match_route_template`, falling back to the raw path."""
+    return match_route_template(scope) or str(scope["path"])
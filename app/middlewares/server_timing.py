@@ -0,0 +1,68 @@
+import time
+
+from loguru import logger
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.timing import RequestTimings, request_timings
+from app.middlewares.routes import get_route_template
+
+
+class ServerTimingMiddleware:
+    """
+    Measures the time a request spends in the database, the cache and
+    authentication, reported in the `Server-Timing` header (in milliseconds,
+    segments may overlap, e.g. auth includes the user lookup of
+    `get_current_user`, cached or from the database).
+
+    Requests running more than `QUERY_COUNT_BUDGET` queries are logged as a
+    warning, which usually means an N+1 query pattern.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings(route=get_route_template(scope))
+        token = request_timings.set(timings)
+        start = time.perf_counter_ns()
+
+        async def send_with_timing(message: Message) -> None:
+            if (
+                message["type"] == "http.response.start"
+                and settings.SERVER_TIMING_ENABLED
+            ):
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Server-Timing",
+                    self.header(timings, (time.perf_counter_ns() - start) / 1e9),
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            request_timings.reset(token)
+
+        if timings.db_queries > settings.QUERY_COUNT_BUDGET:
+            logger.warning(
+                f"{scope['method']} {timings.route} ran "
+                f"{timings.db_queries} queries (budget "
+                f"{settings.QUERY_COUNT_BUDGET}), possible N+1"
+            )
+
+    @staticmethod
+    def header(timings: RequestTimings, total: float) -> str:
+        metrics = [
+            f"db;dur={timings.segments['db'] * 1000:.1f};"
+            f'desc="{timings.db_queries} queries"',
+            f"cache;dur={timings.segments['cache'] * 1000:.1f}",
+            f"auth;dur={timings.segments['auth'] * 1000:.1f}",
+            f"total;dur={total * 1000:.1f}",
+        ]
+        return ", ".join(metrics)
@@ -1,5 +1,12 @@
-from .health import APIStatus
+from .health import APIStatus, DBPoolStatus
 from .helpers import Message, MessageDetail
+from .memory import (
+    AllocationDiff,
+    AllocationStat,
+    GCGeneration,
+    MemoryStatus,
+    SnapshotOut,
+)
 from .post import (
     NewPostOut,
     PostBase,
@@ -8,12 +15,17 @@ from .post import (
     PostUpdateIn,
     PostUpdateOut,
 )
-from .token import Token, TokenData
+from .token import Principal, Token, TokenData
 from .user import UserCreate, UserCreditCardIn, UserCreditCardOut, UserOut
 from .vote import Vote
 
 __all__ = [
     "APIStatus",
+    "AllocationDiff",
+    "AllocationStat",
+    "DBPoolStatus",
+    "GCGeneration",
+    "MemoryStatus",
     "Message",
     "MessageDetail",
     "NewPostOut",
@@ -22,6 +34,8 @@ __all__ = [
     "PostOut",
     "PostUpdateIn",
     "PostUpdateOut",
+    "Principal",
+    "SnapshotOut",
     "Token",
     "TokenData",
     "UserCreate",
@@ -4,6 +4,26 @@ from typing import Literal
 from pydantic import BaseModel, Field
 
 
+class DBPoolStatus(BaseModel):
+    size: int = Field(description="Connections kept in the pool", examples=[5])
+    max_overflow: int = Field(
+        description="Extra connections allowed over the pool size", examples=[10]
+    )
+    checked_out: int = Field(description="Connections in use", examples=[2])
+    overflow: int = Field(description="Extra connections open", examples=[0])
+    saturation: float = Field(
+        description="Connections in use over the pool capacity", examples=[0.13]
+    )
+    checkouts: int = Field(description="Connections checked out", examples=[1234])
+    timeouts: int = Field(description="Checkouts that timed out", examples=[0])
+    wait_seconds_total: float = Field(
+        description="Total time spent waiting for a connection", examples=[0.12]
+    )
+    wait_seconds_max: float = Field(
+        description="Longest wait for a connection", examples=[0.01]
+    )
+
+
 class APIStatus(BaseModel):
     environment: str = Field(
         description="Represents the environment in which the API is running",
@@ -27,3 +47,12 @@ class APIStatus(BaseModel):
     uptime: str = Field(
         description="Represents the API's uptime in seconds", examples=["1234.56789"]
     )
+    db_pool: DBPoolStatus | None = Field(
+        None,
+        description="Represents the connection pool usage of the worker (if pooled)",
+    )
+    bcrypt_queue_depth: int = Field(
+        0,
+        description="Represents the password hashing operations waiting for a worker",
+        examples=[0],
+    )
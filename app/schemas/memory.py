@@ -0,0 +1,61 @@
+from datetime import datetime
+
+from pydantic import BaseModel, Field
+
+
+class GCGeneration(BaseModel):
+    generation: int = Field(description="Garbage collector generation", examples=[0])
+    objects: int = Field(
+        description="Objects tracked since the last collection", examples=[512]
+    )
+    collections: int = Field(description="Collections run", examples=[1024])
+    collected: int = Field(description="Objects collected", examples=[20480])
+    uncollectable: int = Field(description="Objects found uncollectable", examples=[0])
+
+
+class SnapshotOut(BaseModel):
+    id: int = Field(description="ID of the snapshot in the worker", examples=[1])
+    taken_at: datetime = Field(
+        description="When the snapshot was taken", examples=["2023-05-12T12:34:56Z"]
+    )
+    traced_memory: int = Field(
+        description="Memory traced by tracemalloc (bytes)", examples=[1048576]
+    )
+
+
+class MemoryStatus(BaseModel):
+    pid: int = Field(description="Process ID of the worker", examples=[42])
+    rss: int = Field(description="Resident set size (bytes)", examples=[104857600])
+    vms: int = Field(description="Virtual memory size (bytes)", examples=[419430400])
+    gc: list[GCGeneration] = Field(description="Garbage collector generations")
+    tracing: bool = Field(description="Whether tracemalloc is tracing")
+    traced_memory: int = Field(
+        0, description="Memory traced by tracemalloc (bytes)", examples=[1048576]
+    )
+    traced_memory_peak: int = Field(
+        0, description="Peak memory traced by tracemalloc (bytes)", examples=[2097152]
+    )
+    snapshots: list[SnapshotOut] = Field(description="Snapshots kept by the worker")
+
+
+class AllocationStat(BaseModel):
+    location: str = Field(
+        description="File and line of the most recent frame",
+        examples=["app/services/cache.py:42"],
+    )
+    traceback: list[str] = Field(
+        description="Frames of the allocation, oldest first",
+        examples=[["app/main.py:10", "app/services/cache.py:42"]],
+    )
+    size: int = Field(description="Memory allocated (bytes)", examples=[65536])
+    count: int = Field(description="Memory blocks allocated", examples=[128])
+
+
+class AllocationDiff(AllocationStat):
+    size_diff: int = Field(
+        description="Memory allocated since the base snapshot (bytes)",
+        examples=[32768],
+    )
+    count_diff: int = Field(
+        description="Memory blocks allocated since the base snapshot", examples=[64]
+    )
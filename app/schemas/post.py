@@ -51,3 +51,9 @@ class PostOut(BaseModel):
 
     Post: NewPostOut
     votes: int = Field(title="Count of votes", examples=["1"])
+    my_vote: bool | None = Field(
+        None,
+        title="Voted by me",
+        description="Whether the current user voted the post (`include=my_vote`)",
+        examples=[True],
+    )
@@ -1,4 +1,6 @@
-from pydantic import BaseModel
+from datetime import datetime
+
+from pydantic import BaseModel, EmailStr, Field
 
 
 class Token(BaseModel):
@@ -8,3 +10,12 @@ class Token(BaseModel):
 
 class TokenData(BaseModel):
     id: int | None = None
+
+
+class Principal(BaseModel):
+    """Authenticated user built from the access token claims only."""
+
+    id: int = Field(title="ID of the user", examples=["1"])
+    email: EmailStr | None = Field(None, title="Email of the user")
+    issued_at: datetime | None = Field(None, title="Token issued at")
+    token_version: int = Field(1, title="Token version")
@@ -1,3 +1,4 @@
+import hashlib
 import json
 from typing import Any, cast
 
@@ -5,9 +6,14 @@ from loguru import logger
 from redis.asyncio import Redis
 
 from app.core.config import settings
+from app.core.metrics import CACHE_LOOKUPS
+from app.core.timing import timed
+from app.core.tracing import traced
 
 
 class CacheService:
+    MISSING: dict[str, bool] = {"__missing__": True}
+
     redis_client: Redis = Redis(
         host=settings.REDIS_HOSTNAME,
         port=settings.REDIS_PORT,
@@ -21,6 +27,13 @@ class CacheService:
         self.endpoint_path = endpoint_path
         self._enabled = enabled
 
+    @staticmethod
+    def build_key(prefix: str, params: dict[str, Any]) -> str:
+        """Build a fixed-length cache key from a prefix and a dict of params."""
+        serialized = json.dumps(params, sort_keys=True, separators=(",", ":"))
+        digest = hashlib.sha256(serialized.encode("utf-8")).hexdigest()[:32]
+        return f"{prefix}:{digest}"
+
     @property
     def is_enabled(self) -> bool:
         """Check if caching is enabled globally and for this specific endpoint."""
@@ -37,6 +50,8 @@ class CacheService:
 
         return True
 
+    @traced("cache.get")
+    @timed("cache")
     async def get(self, key: str) -> Any | None:
         """Get a value from cache. Returns None if disabled or key not found."""
         if not self.is_enabled:
@@ -46,12 +61,34 @@ class CacheService:
             data = await self.redis.get(key)
             if data:
                 logger.info(f"Cache HIT for key: {key}")
+                CACHE_LOOKUPS.labels("response", "hit").inc()
                 return json.loads(data)
             logger.info(f"Cache MISS for key: {key}")
+            CACHE_LOOKUPS.labels("response", "miss").inc()
         except Exception as e:
             logger.error(f"Error retrieving from cache ({key}): {e}")
         return None
 
+    @traced("cache.get_many")
+    @timed("cache")
+    async def get_many(self, keys: list[str]) -> list[Any | None]:
+        """Get several values from cache. Missing keys are returned as None."""
+        if not self.is_enabled or not keys:
+            return [None] * len(keys)
+
+        try:
+            values = await self.redis.mget(keys)
+            logger.info(f"Cache MGET for {len(keys)} keys")
+            hits = sum(1 for value in values if value)
+            CACHE_LOOKUPS.labels("response", "hit").inc(hits)
+            CACHE_LOOKUPS.labels("response", "miss").inc(len(keys) - hits)
+            return [json.loads(value) if value else None for value in values]
+        except Exception as e:
+            logger.error(f"Error retrieving many from cache: {e}")
+        return [None] * len(keys)
+
+    @traced("cache.set")
+    @timed("cache")
     async def set(self, key: str, value: Any, ex: int | None = None) -> bool:
         """Set a value in cache. Does nothing if caching is disabled."""
         if not self.is_enabled:
@@ -67,6 +104,19 @@ class CacheService:
             logger.error(f"Error saving to cache ({key}): {e}")
             return False
 
+    async def set_missing(
+        self, key: str, ex: int = settings.CACHE_NEGATIVE_TTL
+    ) -> bool:
+        """Cache a not found result so repeated lookups skip the database."""
+        return await self.set(key, self.MISSING, ex=ex)
+
+    @classmethod
+    def is_missing(cls, value: Any) -> bool:
+        """Check if a cached value is a not found marker."""
+        return bool(value == cls.MISSING)
+
+    @traced("cache.delete")
+    @timed("cache")
     async def delete(self, key: str) -> bool:
         """Delete a specific key from cache."""
         try:
@@ -87,6 +137,8 @@ class CacheService:
             logger.error(f"Error clearing full cache: {e}")
             return False
 
+    @traced("cache.clear_pattern")
+    @timed("cache")
     async def clear_pattern(self, pattern: str) -> bool:
         """Delete all keys matching a specific pattern (e.g., 'posts:*')."""
         try:
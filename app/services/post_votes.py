@@ -0,0 +1,112 @@
+from typing import Any, cast
+
+from loguru import logger
+
+from app.services.cache import CacheService
+
+# Patches the votes of a cached post in place (keeping its TTL) and bumps the
+# post entry of the shared vote counts hash, only when they are already cached.
+ADJUST_VOTES_SCRIPT = """
+local delta = tonumber(ARGV[2])
+local raw = redis.call('GET', KEYS[1])
+if raw then
+    local data = cjson.decode(raw)
+    if type(data['votes']) == 'number' then
+        data['votes'] = data['votes'] + delta
+        redis.call('SET', KEYS[1], cjson.encode(data), 'KEEPTTL')
+    end
+end
+if redis.call('HEXISTS', KEYS[2], ARGV[1]) == 1 then
+    redis.call('HINCRBY', KEYS[2], ARGV[1], delta)
+end
+return 1
+"""
+
+# Seeds vote counts read from the database, overwriting the cached ones (which
+# may have missed a vote or be stale) except for posts with buffered votes not
+# flushed yet (write-behind), whose count is kept by the vote buffer.
+SEED_VOTES_SCRIPT = """
+for i = 2, #ARGV, 2 do
+    if redis.call('HEXISTS', KEYS[2], ARGV[i]) == 0 then
+        redis.call('HSET', KEYS[1], ARGV[i], ARGV[i + 1])
+    else
+        redis.call('HSETNX', KEYS[1], ARGV[i], ARGV[i + 1])
+    end
+end
+redis.call('EXPIRE', KEYS[1], ARGV[1])
+return 1
+"""
+
+# Pending vote count per post of the vote buffer
+PENDING_POSTS_KEY = "votes:pending:posts"
+
+
+class PostVotesCache:
+    """
+    Keeps the vote counts of cached posts fresh without evicting them.
+
+    Single posts (`posts:{id}`) are patched in place. List pages are left
+    untouched and their counts are merged at read time from a shared hash
+    (`posts:votes`) that is seeded when pages are built and adjusted on votes.
+    Rebuilt pages overwrite the counts, so they are at most as stale as the
+    pages themselves.
+    """
+
+    counts_key = "posts:votes"
+
+    adjust_script = CacheService.redis_client.register_script(ADJUST_VOTES_SCRIPT)
+    seed_script = CacheService.redis_client.register_script(SEED_VOTES_SCRIPT)
+
+    def __init__(self, cache: CacheService):
+        self.cache = cache
+        self.redis = cache.redis
+
+    async def adjust(self, post_id: int, delta: int) -> None:
+        """Add `delta` to the cached vote count of a post."""
+        if not self.cache.is_enabled:
+            return
+
+        try:
+            await self.adjust_script(
+                keys=[f"posts:{post_id}", self.counts_key], args=[post_id, delta]
+            )
+            logger.info(f"Cache votes adjusted for post {post_id} ({delta:+d})")
+        except Exception as e:
+            logger.error(f"Error adjusting cached votes (post {post_id}): {e}")
+
+    async def seed(self, counts: dict[int, int], ex: int) -> None:
+        """Store the vote counts read from the database for a list page."""
+        if not self.cache.is_enabled or not counts:
+            return
+
+        args: list[int] = [ex]
+        for post_id, votes in counts.items():
+            args.extend((post_id, votes))
+        try:
+            await self.seed_script(keys=[self.counts_key, PENDING_POSTS_KEY], args=args)
+        except Exception as e:
+            logger.error(f"Error seeding cached votes: {e}")
+
+    async def merge(self, posts: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Replace the votes of cached list entries with the fresh counts."""
+        if not self.cache.is_enabled or not posts:
+            return posts
+
+        try:
+            post_ids = [post["Post"]["id"] for post in posts]
+            counts = await cast(Any, self.redis.hmget(self.counts_key, post_ids))
+        except Exception as e:
+            logger.error(f"Error reading cached votes: {e}")
+            return posts
+
+        for post, votes in zip(posts, counts, strict=True):
+            if votes is not None:
+                post["votes"] = int(votes)
+        return posts
+
+    async def forget(self, post_id: int) -> None:
+        """Drop the cached vote count of a deleted post."""
+        try:
+            await cast(Any, self.redis.hdel(self.counts_key, str(post_id)))
+        except Exception as e:
+            logger.error(f"Error deleting cached votes (post {post_id}): {e}")
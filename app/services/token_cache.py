@@ -0,0 +1,65 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+from app.core.config import settings
+
+
+class TokenCache:
+    """
+    Per-worker LRU of verified JWT claims, keyed by the SHA-256 of the token.
+
+    Claims are kept until the token expires, so a token seen before skips the
+    signature verification and JSON parsing. Only tokens with a numeric `exp`
+    in the future are cached.
+    """
+
+    def __init__(self, maxsize: int = settings.TOKEN_CACHE_SIZE) -> None:
+        self.maxsize = maxsize
+        self._claims: OrderedDict[str, tuple[float, dict[str, Any]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(token: str) -> str:
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    def get(self, token: str) -> dict[str, Any] | None:
+        """Get the claims of a verified token. Returns None if not cached."""
+        key = self.key(token)
+        with self._lock:
+            entry = self._claims.get(key)
+            if entry is None:
+                return None
+            expires_at, claims = entry
+            if expires_at <= time.time():
+                del self._claims[key]
+                return None
+            self._claims.move_to_end(key)
+            return claims
+
+    def set(self, token: str, claims: dict[str, Any]) -> None:
+        """Cache the claims of a verified token until it expires."""
+        expires_at = claims.get("exp")
+        if (
+            self.maxsize <= 0
+            or not isinstance(expires_at, int | float)
+            or expires_at <= time.time()
+        ):
+            return
+
+        key = self.key(token)
+        with self._lock:
+            self._claims[key] = (expires_at, dict(claims))
+            self._claims.move_to_end(key)
+            while len(self._claims) > self.maxsize:
+                self._claims.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop every cached token."""
+        with self._lock:
+            self._claims.clear()
+
+
+token_cache = TokenCache()
@@ -0,0 +1,165 @@
+import math
+import time
+import uuid
+from datetime import UTC, datetime, timedelta
+from typing import Any, cast
+
+from loguru import logger
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models import Post, Vote
+from app.services.cache import CacheService
+from app.services.vote_buffer import RELEASE_LOCK_SCRIPT
+
+# Adds `amount` votes to a post, weighted by 2 ^ ((at - epoch) / half-life) so
+# that older votes decay relative to newer ones. `at` is now unless given (the
+# time a removed vote was cast, to subtract the weight it added). Scores are
+# rebased (scaled down) when weights grow too large, and only the top `max`
+# posts are kept.
+# Does nothing (returns 0) until the ranking has been built.
+INCREMENT_SCRIPT = """
+local epoch = tonumber(redis.call('GET', KEYS[2]))
+if not epoch then
+    return 0
+end
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local exponent = (now - epoch) / tonumber(ARGV[3])
+if exponent > 64 then
+    redis.call('ZUNIONSTORE', KEYS[1], 1, KEYS[1], 'WEIGHTS', 2 ^ -exponent)
+    redis.call('SET', KEYS[2], now)
+    epoch = now
+end
+local at = tonumber(ARGV[5]) or now
+local weight = tonumber(ARGV[2]) * 2 ^ ((at - epoch) / tonumber(ARGV[3]))
+local score = redis.call('ZINCRBY', KEYS[1], weight, ARGV[1])
+if tonumber(score) < 0 then
+    redis.call('ZADD', KEYS[1], 0, ARGV[1])
+end
+local size = redis.call('ZCARD', KEYS[1])
+if size > tonumber(ARGV[4]) then
+    redis.call('ZREMRANGEBYRANK', KEYS[1], 0, size - tonumber(ARGV[4]) - 1)
+end
+return 1
+"""
+
+
+class TrendingPosts:
+    """
+    Ranking of trending posts kept in a Redis sorted set (`posts:trending`).
+
+    Each post scores one vote when created plus its votes, and every vote
+    weighs twice as much as one cast `TRENDING_HALF_LIFE` seconds earlier.
+    Scores are updated incrementally, so reading the top N is O(log n + N).
+    The ranking is built from the database the first time it is needed.
+    """
+
+    key = "posts:trending"
+    epoch_key = "posts:trending:epoch"
+    lock_key = "posts:trending:lock"
+
+    increment_script = CacheService.redis_client.register_script(INCREMENT_SCRIPT)
+    release_script = CacheService.redis_client.register_script(RELEASE_LOCK_SCRIPT)
+
+    def __init__(self) -> None:
+        self.redis = CacheService.redis_client
+
+    async def add_post(self, post_id: int) -> None:
+        """Add a newly created post to the ranking."""
+        await self._increment(post_id, 1)
+
+    async def add_vote(
+        self, post_id: int, delta: int, voted_at: datetime | None = None
+    ) -> None:
+        """
+        Add (`delta` 1) or remove (`delta` -1) a vote of a post. Removed votes
+        subtract the weight they had when cast (`voted_at`, now if unknown).
+        """
+        await self._increment(post_id, delta, voted_at)
+
+    async def forget(self, post_id: int) -> None:
+        """Remove a deleted post from the ranking."""
+        try:
+            await cast(Any, self.redis.zrem(self.key, str(post_id)))
+        except Exception as e:
+            logger.error(f"Error removing post {post_id} from trending: {e}")
+
+    async def _increment(
+        self, post_id: int, amount: int, at: datetime | None = None
+    ) -> None:
+        try:
+            await self.increment_script(
+                keys=[self.key, self.epoch_key],
+                args=[
+                    post_id,
+                    amount,
+                    settings.TRENDING_HALF_LIFE,
+                    settings.TRENDING_MAX_POSTS,
+                    at.timestamp() if at else "",
+                ],
+            )
+        except Exception as e:
+            logger.error(f"Error updating trending score (post {post_id}): {e}")
+
+    async def top(self, limit: int, db: Session) -> list[int] | None:
+        """
+        Get the ids of the top trending posts, building the ranking if needed.
+        Returns None while another worker is building it.
+        """
+        if not await self.redis.exists(self.epoch_key) and not await self.build(db):
+            return None
+        post_ids = await cast(Any, self.redis.zrevrange(self.key, 0, limit - 1))
+        return [int(post_id) for post_id in post_ids]
+
+    async def build(self, db: Session) -> bool:
+        """
+        Build the ranking from the posts and votes stored in the database.
+        Returns False if another worker is building it.
+        """
+        token = uuid.uuid4().hex
+        if not await cast(Any, self.redis.set(self.lock_key, token, nx=True, ex=60)):
+            return False
+
+        try:
+            now = time.time()
+            half_life = settings.TRENDING_HALF_LIFE
+            # Older posts and votes weigh less than 2^-20 of a new one
+            since = datetime.now(UTC) - timedelta(seconds=half_life * 20)
+
+            def weight(created_at: datetime) -> float:
+                return math.pow(2, (created_at.timestamp() - now) / half_life)
+
+            scores: dict[str, float] = {}
+            stmt_posts = select(Post.id, Post.created_at).where(
+                Post.created_at >= since
+            )
+            for post_id, created_at in db.execute(stmt_posts).all():
+                scores[str(post_id)] = weight(created_at)
+
+            stmt_votes = select(Vote.post_id, Vote.created_at).where(
+                Vote.created_at >= since
+            )
+            for post_id, created_at in db.execute(stmt_votes).all():
+                scores[str(post_id)] = scores.get(str(post_id), 0) + weight(created_at)
+
+            top_scores = dict(
+                sorted(scores.items(), key=lambda item: item[1], reverse=True)[
+                    : settings.TRENDING_MAX_POSTS
+                ]
+            )
+
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.delete(self.key)
+                if top_scores:
+                    pipe.zadd(self.key, top_scores)
+                pipe.set(self.epoch_key, now)
+                await pipe.execute()
+            logger.info(f"Trending ranking built with {len(top_scores)} posts")
+            return True
+        finally:
+            await self.release_script(keys=[self.lock_key], args=[token])
+
+
+trending_posts = TrendingPosts()
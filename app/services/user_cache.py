@@ -0,0 +1,117 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+from loguru import logger
+from redis import Redis
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from app.core.config import settings
+from app.core.metrics import CACHE_LOOKUPS
+from app.models import User
+from app.schemas import UserOut
+
+
+class UserCache:
+    """
+    Short-lived cache of authenticated users (`users:auth:{id}`).
+
+    Users are kept in process for `USER_CACHE_LOCAL_TTL` seconds and in Redis
+    for `USER_CACHE_TTL` seconds, so authenticating a request usually needs no
+    database query. The password hash is never cached, it is loaded on access.
+
+    It is used by the (sync) `get_current_user` dependency, so it talks to
+    Redis with a blocking client.
+    """
+
+    redis_client: Redis = Redis(
+        host=settings.REDIS_HOSTNAME,
+        port=settings.REDIS_PORT,
+        decode_responses=True,
+        socket_timeout=1,
+    )
+
+    def __init__(self) -> None:
+        self.redis = self.redis_client
+        self._local: OrderedDict[int, tuple[float, dict[str, Any]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(user_id: int) -> str:
+        return f"users:auth:{user_id}"
+
+    def get(self, user_id: int, db: Session) -> User | None:
+        """Get a cached user attached to `db`. Returns None on a cache miss."""
+        if not settings.CACHE_ENABLED:
+            return None
+
+        data = self._get_local(user_id)
+        if data is None:
+            try:
+                raw = self.redis.get(self.key(user_id))
+            except Exception as e:
+                logger.error(f"Error retrieving cached user {user_id}: {e}")
+                return None
+            if not raw:
+                CACHE_LOOKUPS.labels("user", "miss").inc()
+                return None
+            data = json.loads(str(raw))
+            self._set_local(user_id, data)
+        CACHE_LOOKUPS.labels("user", "hit").inc()
+
+        user = User(**UserOut.model_validate(data).model_dump())
+        make_transient_to_detached(user)
+        return db.merge(user, load=False)
+
+    def set(self, user: User) -> None:
+        """Cache a user loaded from the database."""
+        if not settings.CACHE_ENABLED:
+            return
+
+        try:
+            data = UserOut.model_validate(user).model_dump(mode="json")
+            self.redis.set(
+                self.key(user.id), json.dumps(data), ex=settings.USER_CACHE_TTL
+            )
+            self._set_local(user.id, data)
+        except Exception as e:
+            logger.error(f"Error caching user: {e}")
+
+    def invalidate(self, user_id: int) -> None:
+        """Drop a user from the cache after it changes."""
+        with self._lock:
+            self._local.pop(user_id, None)
+        try:
+            self.redis.delete(self.key(user_id))
+        except Exception as e:
+            logger.error(f"Error invalidating cached user {user_id}: {e}")
+
+    def clear_local(self) -> None:
+        """Drop every user cached in this process."""
+        with self._lock:
+            self._local.clear()
+
+    def _get_local(self, user_id: int) -> dict[str, Any] | None:
+        with self._lock:
+            entry = self._local.get(user_id)
+            if entry is None:
+                return None
+            expires_at, data = entry
+            if expires_at < time.monotonic():
+                del self._local[user_id]
+                return None
+            self._local.move_to_end(user_id)
+            return data
+
+    def _set_local(self, user_id: int, data: dict[str, Any]) -> None:
+        expires_at = time.monotonic() + settings.USER_CACHE_LOCAL_TTL
+        with self._lock:
+            self._local[user_id] = (expires_at, data)
+            self._local.move_to_end(user_id)
+            while len(self._local) > settings.USER_CACHE_LOCAL_SIZE:
+                self._local.popitem(last=False)
+
+
+user_cache = UserCache()
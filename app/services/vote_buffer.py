@@ -0,0 +1,339 @@
+import asyncio
+import uuid
+from collections import Counter
+from typing import Any, cast
+
+from loguru import logger
+from sqlalchemy import delete, func, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.models import Post, Vote
+from app.services.cache import CacheService
+from app.services.post_votes import PENDING_POSTS_KEY, PostVotesCache
+
+# Placeholder member so a post without votes still has a (non-empty) voters set
+PLACEHOLDER = "-"
+
+# Records a vote: dedupes against the voters set, refreshes the vote count of
+# the post (counts hash and cached post) and queues the change to be flushed.
+# Returns -1 if the voters set must be seeded, 0 if nothing changed, 1 if ok.
+RECORD_VOTE_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return -1
+end
+local changed
+if ARGV[3] == '1' then
+    changed = redis.call('SADD', KEYS[1], ARGV[2])
+else
+    changed = redis.call('SREM', KEYS[1], ARGV[2])
+end
+if changed == 0 then
+    return 0
+end
+local votes = redis.call('SCARD', KEYS[1]) - 1
+redis.call('HSET', KEYS[2], ARGV[1], votes)
+local raw = redis.call('GET', KEYS[5])
+if raw then
+    local data = cjson.decode(raw)
+    if type(data['votes']) == 'number' then
+        data['votes'] = votes
+        redis.call('SET', KEYS[5], cjson.encode(data), 'KEEPTTL')
+    end
+end
+if redis.call('HSET', KEYS[3], ARGV[1] .. ':' .. ARGV[2], ARGV[3]) == 1 then
+    redis.call('HINCRBY', KEYS[4], ARGV[1], 1)
+end
+return 1
+"""
+
+# Seeds the voters set of a post from the database, unless already seeded
+SEED_VOTERS_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    return 0
+end
+for i = 1, #ARGV, 1000 do
+    redis.call('SADD', KEYS[1], unpack(ARGV, i, math.min(i + 999, #ARGV)))
+end
+return 1
+"""
+
+# Claims the pending votes for flushing (or the batch of a failed flush)
+CLAIM_PENDING_SCRIPT = """
+if redis.call('EXISTS', KEYS[2]) == 0 then
+    if redis.call('EXISTS', KEYS[1]) == 0 then
+        return {}
+    end
+    redis.call('RENAME', KEYS[1], KEYS[2])
+end
+return redis.call('HGETALL', KEYS[2])
+"""
+
+# Marks a claimed batch as flushed, releasing the pending count of its posts
+COMPLETE_FLUSH_SCRIPT = """
+for i = 1, #ARGV, 2 do
+    local left = redis.call('HINCRBY', KEYS[2], ARGV[i], -tonumber(ARGV[i + 1]))
+    if left <= 0 then
+        redis.call('HDEL', KEYS[2], ARGV[i])
+    end
+end
+redis.call('DEL', KEYS[1])
+return 1
+"""
+
+# Rebuilds the vote state of posts without pending votes from database counts,
+# dropping their voters set so it is seeded again on the next vote.
+# Returns the number of posts whose count had drifted.
+RECONCILE_SCRIPT = """
+local drifted = 0
+for i = 1, #ARGV, 2 do
+    local voters_key = KEYS[2 + (i + 1) / 2]
+    if redis.call('HEXISTS', KEYS[1], ARGV[i]) == 0 then
+        local voters = redis.call('SCARD', voters_key)
+        if voters > 0 and voters - 1 ~= tonumber(ARGV[i + 1]) then
+            drifted = drifted + 1
+        end
+        redis.call('DEL', voters_key)
+        redis.call('HSET', KEYS[2], ARGV[i], ARGV[i + 1])
+    end
+end
+return drifted
+"""
+
+RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class VoteBuffer:
+    """
+    Write-behind buffer for votes (enabled with `VOTES_WRITE_BEHIND`).
+
+    Votes are recorded in Redis: a voters set per post dedupes them and keeps
+    the vote count, and a pending hash queues the changes. A background task
+    flushes the pending votes to Postgres in batches and periodically
+    reconciles the Redis state of idle posts with the database.
+    """
+
+    pending_key = "votes:pending"
+    flushing_key = "votes:pending:flushing"
+    pending_posts_key = PENDING_POSTS_KEY
+    lock_key = "votes:flush:lock"
+
+    record_script = CacheService.redis_client.register_script(RECORD_VOTE_SCRIPT)
+    seed_script = CacheService.redis_client.register_script(SEED_VOTERS_SCRIPT)
+    claim_script = CacheService.redis_client.register_script(CLAIM_PENDING_SCRIPT)
+    complete_script = CacheService.redis_client.register_script(COMPLETE_FLUSH_SCRIPT)
+    reconcile_script = CacheService.redis_client.register_script(RECONCILE_SCRIPT)
+    release_script = CacheService.redis_client.register_script(RELEASE_LOCK_SCRIPT)
+
+    def __init__(self) -> None:
+        self.redis = CacheService.redis_client
+
+    @staticmethod
+    def voters_key(post_id: int | str) -> str:
+        return f"votes:voters:{post_id}"
+
+    async def record(
+        self, post_id: int, user_id: int, direction: int, db: Session
+    ) -> bool | None:
+        """
+        Record a vote (`direction` 1) or its removal (`direction` 0).
+
+        Returns None if the post does not exist, False if the vote was already
+        in that state and True if it was recorded.
+        """
+        keys = [
+            self.voters_key(post_id),
+            PostVotesCache.counts_key,
+            self.pending_key,
+            self.pending_posts_key,
+            f"posts:{post_id}",
+        ]
+        args = [post_id, user_id, direction]
+
+        result = await self.record_script(keys=keys, args=args)
+        if result == -1:
+            if not await self.seed(post_id, db):
+                return None
+            result = await self.record_script(keys=keys, args=args)
+        return bool(result == 1)
+
+    async def seed(self, post_id: int, db: Session) -> bool:
+        """Load the voters of a post from the database. False if not found."""
+        stmt_select = (
+            select(Post.id, Vote.user_id)
+            .outerjoin(Vote, Vote.post_id == Post.id)
+            .where(Post.id == post_id)
+        )
+        rows = await run_in_threadpool(lambda: db.execute(stmt_select).all())
+        if not rows:
+            return False
+
+        voters = [PLACEHOLDER] + [str(row[1]) for row in rows if row[1] is not None]
+        await self.seed_script(keys=[self.voters_key(post_id)], args=voters)
+        return True
+
+    async def voted(self, post_ids: list[int], user_id: int) -> dict[int, bool]:
+        """
+        Check whether a user voted the given posts using their voters sets.
+
+        Posts without a voters set are left out and must be read from the database.
+        """
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for post_id in post_ids:
+                pipe.exists(self.voters_key(post_id))
+                pipe.sismember(self.voters_key(post_id), str(user_id))
+            results = await pipe.execute()
+
+        return {
+            post_id: bool(is_member)
+            for post_id, seeded, is_member in zip(
+                post_ids, results[::2], results[1::2], strict=True
+            )
+            if seeded
+        }
+
+    async def forget(self, post_id: int) -> None:
+        """Drop the voters set of a deleted post."""
+        try:
+            await self.redis.delete(self.voters_key(post_id))
+        except Exception as e:
+            logger.error(f"Error deleting voters set (post {post_id}): {e}")
+
+    async def flush(self) -> int:
+        """Flush pending votes to the database. Returns the number flushed."""
+        token = await self._acquire_lock()
+        if token is None:
+            return 0
+
+        try:
+            raw = await self.claim_script(
+                keys=[self.pending_key, self.flushing_key], args=[]
+            )
+            entries = dict(zip(raw[::2], raw[1::2], strict=True))
+            if not entries:
+                return 0
+
+            await run_in_threadpool(self._apply, entries)
+
+            per_post = Counter(field.split(":")[0] for field in entries)
+            args: list[Any] = []
+            for post_id, count in per_post.items():
+                args.extend((post_id, count))
+            await self.complete_script(
+                keys=[self.flushing_key, self.pending_posts_key], args=args
+            )
+            logger.info(f"Flushed {len(entries)} buffered votes")
+            return len(entries)
+        finally:
+            await self.release_script(keys=[self.lock_key], args=[token])
+
+    def _apply(self, entries: dict[str, str]) -> None:
+        batch_size = settings.VOTES_FLUSH_BATCH_SIZE
+        votes: list[tuple[int, int, str]] = []
+        for field, direction in entries.items():
+            post_id, user_id = field.split(":")
+            votes.append((int(post_id), int(user_id), direction))
+
+        with SessionLocal() as db:
+            for start in range(0, len(votes), batch_size):
+                batch = votes[start : start + batch_size]
+
+                # Skip votes for posts deleted before the flush
+                post_ids = {post_id for post_id, _, _ in batch}
+                stmt_select = select(Post.id).where(Post.id.in_(post_ids))
+                existing = set(db.execute(stmt_select).scalars().all())
+
+                upvotes = [
+                    {"post_id": post_id, "user_id": user_id}
+                    for post_id, user_id, direction in batch
+                    if direction == "1" and post_id in existing
+                ]
+                unvotes = [
+                    (user_id, post_id)
+                    for post_id, user_id, direction in batch
+                    if direction == "0"
+                ]
+
+                if upvotes:
+                    db.execute(insert(Vote).values(upvotes).on_conflict_do_nothing())
+                if unvotes:
+                    stmt_delete = delete(Vote).where(
+                        tuple_(Vote.user_id, Vote.post_id).in_(unvotes)
+                    )
+                    db.execute(stmt_delete)
+            db.commit()
+
+    async def reconcile(self) -> int:
+        """Repair drift between Redis and Postgres. Returns drifted posts."""
+        token = await self._acquire_lock()
+        if token is None:
+            return 0
+
+        drifted = 0
+        try:
+            async for keys in self._scan_voters():
+                post_ids = [int(key.rsplit(":", 1)[1]) for key in keys]
+                counts = await run_in_threadpool(self._count_votes, post_ids)
+                args: list[Any] = []
+                for post_id in post_ids:
+                    args.extend((post_id, counts.get(post_id, 0)))
+                drifted += await self.reconcile_script(
+                    keys=[self.pending_posts_key, PostVotesCache.counts_key, *keys],
+                    args=args,
+                )
+        finally:
+            await self.release_script(keys=[self.lock_key], args=[token])
+
+        if drifted:
+            logger.warning(f"Repaired buffered vote drift for {drifted} posts")
+        return drifted
+
+    async def _scan_voters(self) -> Any:
+        batch: list[str] = []
+        async for key in self.redis.scan_iter(match=self.voters_key("*"), count=500):
+            batch.append(key)
+            if len(batch) >= 500:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def _count_votes(self, post_ids: list[int]) -> dict[int, int]:
+        with SessionLocal() as db:
+            stmt_select = (
+                select(Vote.post_id, func.count(Vote.post_id))
+                .where(Vote.post_id.in_(post_ids))
+                .group_by(Vote.post_id)
+            )
+            return {row[0]: row[1] for row in db.execute(stmt_select).all()}
+
+    async def _acquire_lock(self) -> str | None:
+        token = uuid.uuid4().hex
+        acquired = await cast(Any, self.redis.set(self.lock_key, token, nx=True, ex=60))
+        return token if acquired else None
+
+    async def run(self) -> None:
+        """Flush pending votes and reconcile them periodically until cancelled."""
+        interval = settings.VOTES_FLUSH_INTERVAL
+        reconcile_every = max(1, round(settings.VOTES_RECONCILE_INTERVAL / interval))
+        ticks = 0
+        while True:
+            await asyncio.sleep(interval)
+            ticks += 1
+            try:
+                await self.flush()
+                if ticks % reconcile_every == 0:
+                    await self.reconcile()
+            except Exception as e:
+                logger.error(f"Error flushing buffered votes: {e}")
+
+
+vote_buffer = VoteBuffer()
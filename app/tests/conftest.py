@@ -5,6 +5,8 @@ from unittest.mock import MagicMock
 
 import pytest
 from fastapi.testclient import TestClient
+from redis import Redis
+from redis.exceptions import RedisError
 from sqlalchemy import create_engine
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session, sessionmaker
@@ -12,8 +14,12 @@ from sqlalchemy.orm import Session, sessionmaker
 from app.core.config import settings
 from app.core.oauth import create_access_token
 from app.db.database import Base, get_db
+from app.db.replicas import recent_writes
 from app.main import app
 from app.models import Post, User
+from app.services.cache import CacheService
+from app.services.token_cache import token_cache
+from app.services.user_cache import user_cache
 
 SQLALCHEMY_DATABASE_URL = f"{settings.SQLALCHEMY_DATABASE_URI}"
 
@@ -33,6 +39,20 @@ def session() -> Generator[Session]:
         db.close()
 
 
+@pytest.fixture(autouse=True)
+def clear_cache() -> None:
+    # Database ids restart on every test, so cached entries must not leak
+    try:
+        Redis(host=settings.REDIS_HOSTNAME, port=settings.REDIS_PORT).flushdb()
+    except RedisError:
+        logging.debug("Redis is not available, skipping cache clear")
+    user_cache.clear_local()
+    token_cache.clear()
+    recent_writes.clear_local()
+    # Drop connections bound to the event loop of a previous test
+    CacheService.redis_client.connection_pool.reset()  # type: ignore[no-untyped-call]
+
+
 @pytest.fixture()
 def client(session: Session) -> Generator[TestClient]:
     def override_get_db() -> Generator[Session]:
@@ -43,7 +63,9 @@ def client(session: Session) -> Generator[TestClient]:
 
     app.dependency_overrides[get_db] = override_get_db
 
-    yield TestClient(app)
+    # Keep a single event loop, async Redis connections are bound to it
+    with TestClient(app) as test_client:
+        yield test_client
 
 
 @pytest.fixture
@@ -0,0 +1,81 @@
+from collections.abc import Generator
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.core.memory import memory_profiler
+from app.core.oauth import create_access_token
+from app.models import User
+
+# Kept alive between snapshots
+leak: list[bytes] = []
+
+
+@pytest.fixture
+def admin_client(
+    client: TestClient, test_user: User, monkeypatch: pytest.MonkeyPatch
+) -> Generator[TestClient]:
+    monkeypatch.setattr(settings, "ADMIN_USER_IDS", [test_user.id])
+    token = create_access_token({"sub": test_user.id, "email": test_user.email})
+    client.headers = {**client.headers, "Authorization": f"Bearer {token}"}
+    yield client
+    memory_profiler.stop()
+    memory_profiler.clear()
+    leak.clear()
+
+
+# Test: admin endpoints are forbidden to other users
+def test_admin_forbidden(authorized_client: TestClient) -> None:
+    res = authorized_client.get("/api/v1/admin/memory")
+    assert res.status_code == 403
+    res = authorized_client.post("/api/v1/admin/memory/tracemalloc/start")
+    assert res.status_code == 403
+
+
+# Test: memory usage of the worker
+def test_get_memory(admin_client: TestClient) -> None:
+    res = admin_client.get("/api/v1/admin/memory")
+    assert res.status_code == 200
+    memory = res.json()
+    assert memory["rss"] > 0
+    assert [gen["generation"] for gen in memory["gc"]][:3] == [0, 1, 2]
+    assert memory["tracing"] is False
+
+
+# Test: snapshots need tracemalloc started
+def test_snapshot_not_tracing(admin_client: TestClient) -> None:
+    res = admin_client.post("/api/v1/admin/memory/snapshots")
+    assert res.status_code == 409
+    res = admin_client.get("/api/v1/admin/memory/snapshots/1")
+    assert res.status_code == 404
+
+
+# Test: diffing two snapshots points at the allocating line
+def test_snapshot_diff(admin_client: TestClient) -> None:
+    res = admin_client.post("/api/v1/admin/memory/tracemalloc/start?frames=5")
+    assert res.status_code == 200
+    assert res.json()["tracing"] is True
+
+    first = admin_client.post("/api/v1/admin/memory/snapshots").json()
+    leak.extend(bytes(1024) for _ in range(2048))
+    second = admin_client.post("/api/v1/admin/memory/snapshots").json()
+    assert second["id"] > first["id"]
+
+    res = admin_client.get(f"/api/v1/admin/memory/snapshots/{second['id']}/diff")
+    assert res.status_code == 200
+    top = res.json()[0]
+    assert top["location"].startswith(__file__)
+    assert top["size_diff"] >= 2048 * 1024
+    assert top["count_diff"] >= 2048
+
+    res = admin_client.get(
+        f"/api/v1/admin/memory/snapshots/{second['id']}",
+        params={"group_by": "traceback", "limit": 5},
+    )
+    assert res.status_code == 200
+    assert 0 < len(res.json()) <= 5
+
+    res = admin_client.post("/api/v1/admin/memory/tracemalloc/stop")
+    assert res.json()["tracing"] is False
+    assert len(res.json()["snapshots"]) == 2
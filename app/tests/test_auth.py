@@ -1,12 +1,19 @@
+from typing import Any
 from unittest.mock import AsyncMock, patch
 
 import pytest
 from authlib.jose import jwt
 from fastapi.testclient import TestClient
+from redis import Redis
+from redis.exceptions import RedisError
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
 
 from app.core.config import settings
+from app.core.oauth import revoke_tokens
 from app.models import User
 from app.schemas import Token
+from app.utils import password_hasher, password_needs_rehash, verify_password
 
 
 # Test: Login with correct credentials should return a valid token
@@ -29,6 +36,11 @@ def test_login(client: TestClient, test_user: User) -> None:
     user_id = payload.get("sub")
     assert user_id == test_user.id
 
+    # And: the claims needed by the claims-only principal
+    assert payload.get("email") == test_user.email
+    assert payload.get("ver") == settings.TOKEN_VERSION
+    assert payload.get("iat") is not None
+
 
 # Test: Login with incorrect credentials or missing fields should fail
 @pytest.mark.parametrize(
@@ -67,6 +79,226 @@ def test_incorrect_login(
     assert res.status_code == status_code
 
 
+# Test: Login should rehash passwords made with another bcrypt cost
+def test_login_rehashes_password(
+    client: TestClient,
+    test_user: User,
+    session: Session,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    # Given: the configured bcrypt cost changed after the user signed up
+    monkeypatch.setattr(settings, "BCRYPT_ROUNDS", 4)
+    stored = session.execute(select(User.password)).scalars().one()
+    assert password_needs_rehash(stored)
+
+    # When: the user logs in
+    res = client.post(
+        "/api/v1/auth/login",
+        data={"username": test_user.email, "password": test_user.password},
+    )
+    assert res.status_code == 200
+
+    # Then: the stored hash uses the new cost and still matches the password
+    session.expire_all()
+    stored = session.execute(select(User.password)).scalars().one()
+    assert stored.startswith("$2b$04$")
+    assert not password_needs_rehash(stored)
+    assert verify_password(test_user.password, stored)
+
+
+# --- Login throttling Tests ---
+
+
+# Fixture: Lower the failed login limits (requires Redis)
+@pytest.fixture()
+def login_limits(monkeypatch: pytest.MonkeyPatch) -> None:
+    try:
+        Redis(host=settings.REDIS_HOSTNAME, port=settings.REDIS_PORT).ping()
+    except RedisError:
+        pytest.skip("Redis is not available")
+    monkeypatch.setattr(settings, "LOGIN_THROTTLE_MAX_PER_ACCOUNT", 2)
+    monkeypatch.setattr(settings, "LOGIN_THROTTLE_MAX_PER_IP", 3)
+
+
+# Test: Repeated failed logins of an account should be throttled
+@pytest.mark.usefixtures("login_limits")
+def test_login_throttled_per_account(client: TestClient, test_user: User) -> None:
+    # Given: the account reached the failed login limit
+    for _ in range(2):
+        res = client.post(
+            "/api/v1/auth/login",
+            data={"username": test_user.email, "password": "wrong_password"},
+        )
+        assert res.status_code == 403
+
+    # When: a login is attempted, even with the right password
+    res = client.post(
+        "/api/v1/auth/login",
+        data={"username": test_user.email, "password": test_user.password},
+    )
+
+    # Then: it should be throttled until the window expires
+    assert res.status_code == 429
+    assert 0 < int(res.headers["Retry-After"]) <= settings.LOGIN_THROTTLE_WINDOW
+
+
+# Test: Failed logins of a client IP across accounts should be throttled
+@pytest.mark.usefixtures("login_limits")
+def test_login_throttled_per_ip(client: TestClient, test_user: User) -> None:
+    # Given: failed logins for several accounts from the same client
+    for i in range(3):
+        res = client.post(
+            "/api/v1/auth/login",
+            data={"username": f"user{i}@test.com", "password": "wrong_password"},
+        )
+        assert res.status_code == 403
+
+    # When: another account logs in from that client
+    res = client.post(
+        "/api/v1/auth/login",
+        data={"username": test_user.email, "password": test_user.password},
+    )
+
+    # Then: it should be throttled
+    assert res.status_code == 429
+
+
+# Test: A successful login should clear the failures of the account
+@pytest.mark.usefixtures("login_limits")
+def test_login_success_resets_throttle(client: TestClient, test_user: User) -> None:
+    for password in ("wrong_password", test_user.password, "wrong_password"):
+        client.post(
+            "/api/v1/auth/login",
+            data={"username": test_user.email, "password": password},
+        )
+
+    res = client.post(
+        "/api/v1/auth/login",
+        data={"username": test_user.email, "password": test_user.password},
+    )
+    assert res.status_code == 200
+
+
+# Test: Logins should fail fast when too many bcrypt checks are pending
+def test_login_password_hasher_busy(
+    client: TestClient, test_user: User, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(password_hasher, "max_pending", 0)
+
+    res = client.post(
+        "/api/v1/auth/login",
+        data={"username": test_user.email, "password": test_user.password},
+    )
+
+    assert res.status_code == 503
+    assert res.headers["Retry-After"] == "1"
+
+
+# --- Claims-only principal Tests ---
+
+
+# Test: Cached reads authenticated by the token claims do not touch the database
+@pytest.mark.usefixtures("test_posts")
+def test_principal_cached_read_without_database(
+    authorized_client: TestClient, session: Session
+) -> None:
+    # Given: a cached page of posts
+    res = authorized_client.get("/api/v1/posts/")
+    assert res.status_code == 200
+
+    statements: list[str] = []
+
+    def record(*args: Any) -> None:
+        statements.append(args[2])
+
+    # When: the page is requested again
+    engine = session.get_bind()
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        res = authorized_client.get("/api/v1/posts/")
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    # Then: no query is executed
+    assert res.status_code == 200
+    assert statements == []
+
+
+# Test: Tokens of an older version should be rejected
+def test_principal_token_version_mismatch(
+    authorized_client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # Given: the token version was bumped after the token was issued
+    monkeypatch.setattr(settings, "TOKEN_VERSION", settings.TOKEN_VERSION + 1)
+
+    # When: the old token is used
+    res = authorized_client.get("/api/v1/posts/")
+
+    # Then: the request should be unauthorized
+    assert res.status_code == 401
+
+
+# Test: Revoked tokens should be rejected when revocation is enabled
+def test_principal_revoked_token(
+    authorized_client: TestClient, test_user: User, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "TOKEN_REVOCATION_ENABLED", True)
+    res = authorized_client.get("/api/v1/posts/")
+    assert res.status_code == 200
+
+    # Given: the tokens of the user were revoked
+    portal = authorized_client.portal
+    assert portal is not None
+    portal.call(revoke_tokens, test_user.id)
+
+    # When: a token issued before is used
+    res = authorized_client.get("/api/v1/posts/")
+
+    # Then: the request should be unauthorized
+    assert res.status_code == 401
+
+
+# Test: Logout revokes the tokens on every auth dependency
+def test_logout_revokes_tokens(
+    authorized_client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "TOKEN_REVOCATION_ENABLED", True)
+    assert authorized_client.get("/api/v1/users/me").status_code == 200
+
+    # Given: the user logged out
+    res = authorized_client.post("/api/v1/auth/logout")
+    assert res.status_code == 204
+
+    # Then: the token is rejected by user and principal endpoints
+    assert authorized_client.get("/api/v1/users/me").status_code == 401
+    assert authorized_client.get("/api/v1/posts/").status_code == 401
+
+
+# Test: Logging in right after a logout (same second) gives a valid token
+def test_login_after_logout(
+    client: TestClient, test_user: User, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "TOKEN_REVOCATION_ENABLED", True)
+    credentials = {"username": test_user.email, "password": test_user.password}
+
+    def login() -> dict[str, str]:
+        res = client.post("/api/v1/auth/login", data=credentials)
+        assert res.status_code == 200
+        return {"Authorization": f"Bearer {res.json()['access_token']}"}
+
+    old_headers = login()
+    res = client.post("/api/v1/auth/logout", headers=old_headers)
+    assert res.status_code == 204
+
+    # When: the user logs in again straight away
+    new_headers = login()
+
+    # Then: only the token issued before the logout is rejected
+    assert client.get("/api/v1/users/me", headers=new_headers).status_code == 200
+    assert client.get("/api/v1/posts/", headers=new_headers).status_code == 200
+    assert client.get("/api/v1/users/me", headers=old_headers).status_code == 401
+
+
 # --- Google OAuth Tests ---
 
 
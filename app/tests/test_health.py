@@ -16,6 +16,8 @@ def test_api_health(client: TestClient) -> None:
     assert res.status_code == 200
     assert data["status"] == "healthy"
     assert data["db_status"] == "healthy"
+    assert data["bcrypt_queue_depth"] == 0
+    assert data["db_pool"]["size"] > 0
 
 
 # Test: /health endpoint should return 503 and status 'unhealthy' when DB error occurs
@@ -0,0 +1,66 @@
+import logging
+
+import pytest
+from fastapi.testclient import TestClient
+from prometheus_client.parser import text_string_to_metric_families
+
+from app.core.metrics import runtime_metrics
+
+
+def get_samples(client: TestClient) -> dict[tuple[str, tuple[str, ...]], float]:
+    res = client.get("/metrics")
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("text/plain")
+    logging.debug(res.text)
+    return {
+        (sample.name, tuple(sorted(sample.labels.values()))): sample.value
+        for family in text_string_to_metric_families(res.text)
+        for sample in family.samples
+    }
+
+
+# Test: /metrics counts the requests per route template and status
+@pytest.mark.usefixtures("test_posts")
+def test_metrics_requests(authorized_client: TestClient) -> None:
+    request_count = ("http_requests_total", ("/api/v1/posts/{id}", "200", "GET"))
+    before = get_samples(authorized_client).get(request_count, 0)
+
+    posts = authorized_client.get("/api/v1/posts/").json()
+    for post in posts[:2]:
+        res = authorized_client.get(f"/api/v1/posts/{post['Post']['id']}")
+        assert res.status_code == 200
+    authorized_client.get("/not/a/route")
+
+    samples = get_samples(authorized_client)
+    assert samples[request_count] == before + 2
+    assert samples[("http_requests_total", ("404", "GET", "unmatched"))] >= 1
+    assert (
+        samples[
+            (
+                "http_request_duration_seconds_count",
+                ("/api/v1/posts/{id}", "200", "GET"),
+            )
+        ]
+        >= 2
+    )
+    assert ("cache_lookups_total", ("miss", "response")) in samples
+
+
+# Test: /metrics reports the database pool usage of the worker
+def test_metrics_db_pool(client: TestClient) -> None:
+    runtime_metrics.sample()
+
+    samples = get_samples(client)
+    assert samples[("db_pool_connections", ("size",))] > 0
+    assert ("db_pool_checkouts_total", ()) in samples
+    assert ("bcrypt_queue_depth", ()) in samples
+
+
+# Test: /metrics reports the memory and garbage collector stats of the worker
+def test_metrics_memory(client: TestClient) -> None:
+    runtime_metrics.sample()
+
+    samples = get_samples(client)
+    assert samples[("worker_rss_bytes", ())] > 0
+    assert ("worker_gc_objects", ("0",)) in samples
+    assert samples[("worker_gc_collections_total", ("0",))] >= 0
@@ -1,11 +1,20 @@
 import logging
+from collections.abc import Generator
+from datetime import UTC, datetime, timedelta
 from typing import Any
 
 import pytest
 from fastapi.testclient import TestClient
+from redis import Redis
 
+from app.api import deps
+from app.core.config import settings
+from app.db import replicas
+from app.db.pool import InstrumentedQueuePool
+from app.db.replicas import ReplicaRouter
 from app.models import Post, User
 from app.schemas import NewPostOut, PostOut, PostUpdateOut
+from app.services.trending import trending_posts
 
 
 # Test: Get all posts should return 200 and the correct number of posts
@@ -23,6 +32,19 @@ def test_get_all_posts(authorized_client: TestClient, test_posts: list[Post]) ->
     assert res.status_code == 200
 
 
+# Test: Responses report the database time and query count
+@pytest.mark.usefixtures("test_posts")
+def test_get_posts_server_timing(authorized_client: TestClient) -> None:
+    res = authorized_client.get("/api/v1/posts/")
+    assert res.status_code == 200
+    header = res.headers["Server-Timing"]
+    logging.debug(header)
+    assert header.startswith("db;dur=")
+    assert 'desc="0 queries"' not in header
+    assert "cache;dur=" in header
+    assert "auth;dur=" in header
+
+
 # Test: Get posts sorted by various fields, including invalid ones
 @pytest.mark.parametrize(
     "fields, status_code",
@@ -43,6 +65,8 @@ def test_get_all_posts(authorized_client: TestClient, test_posts: list[Post]) ->
         ("-field_not_exists", 400),
         ("id,title", 200),
         ("-id,title", 200),
+        ("id,", 200),
+        (" title , -id ", 200),
     ],
 )
 def test_get_posts_sort_by_fields(
@@ -233,3 +257,177 @@ def test_update_post_non_exists(
     res = authorized_client.put("/api/v1/posts/999999999", json=data)
     logging.debug(res)
     assert res.status_code == 404
+
+
+# Test: A post created after a missing lookup should not be hidden by the cache
+def test_get_post_after_missing_lookup(authorized_client: TestClient) -> None:
+    res = authorized_client.get("/api/v1/posts/1")
+    assert res.status_code == 404
+
+    res = authorized_client.get("/api/v1/posts/1")
+    assert res.status_code == 404
+
+    res = authorized_client.post(
+        "/api/v1/posts/", json={"title": "asd", "content": "qwe"}
+    )
+    assert res.status_code == 201
+    post_id = res.json()["id"]
+
+    res = authorized_client.get(f"/api/v1/posts/{post_id}")
+    logging.debug(res.json())
+    assert res.status_code == 200
+
+
+# Test: Trending posts should rank voted posts first, including new votes
+def test_get_trending_posts(
+    authorized_client: TestClient, test_posts: list[Post]
+) -> None:
+    post_ids = [post.id for post in test_posts]
+    res = authorized_client.post(
+        "/api/v1/votes/", json={"post_id": post_ids[1], "dir": 1}
+    )
+    assert res.status_code == 201
+
+    res = authorized_client.get("/api/v1/posts/trending")
+    logging.debug(res.json())
+    assert res.status_code == 200
+    data = [PostOut(**post) for post in res.json()]
+    assert len(data) == len(post_ids)
+    assert data[0].Post.id == post_ids[1]
+    assert data[0].votes == 1
+    assert all("my_vote" not in post for post in res.json())
+
+    res = authorized_client.post(
+        "/api/v1/votes/", json={"post_id": post_ids[1], "dir": 0}
+    )
+    assert res.status_code == 204
+    res = authorized_client.post(
+        "/api/v1/votes/", json={"post_id": post_ids[2], "dir": 1}
+    )
+    assert res.status_code == 201
+
+    res = authorized_client.get("/api/v1/posts/trending", params={"limit": 1})
+    data = [PostOut(**post) for post in res.json()]
+    assert [post.Post.id for post in data] == [post_ids[2]]
+
+
+# Test: Removing a vote should subtract the weight it added when it was cast
+def test_trending_unvote_weight(
+    authorized_client: TestClient, test_posts: list[Post]
+) -> None:
+    redis = Redis(host=settings.REDIS_HOSTNAME, port=settings.REDIS_PORT)
+    portal = authorized_client.portal
+    assert portal is not None
+    post_id = test_posts[0].id
+
+    # Given: the ranking was built
+    assert authorized_client.get("/api/v1/posts/trending").status_code == 200
+    before = redis.zscore(trending_posts.key, str(post_id))
+    assert before is not None
+
+    # When: a vote cast two half-lives ago is added and removed
+    voted_at = datetime.now(UTC) - timedelta(seconds=settings.TRENDING_HALF_LIFE * 2)
+    portal.call(trending_posts.add_vote, post_id, 1, voted_at)
+    added = redis.zscore(trending_posts.key, str(post_id))
+    assert added == pytest.approx(before + 0.25, rel=1e-3)
+    portal.call(trending_posts.add_vote, post_id, -1, voted_at)
+
+    # Then: the score is back where it was
+    after = redis.zscore(trending_posts.key, str(post_id))
+    assert after == pytest.approx(before, rel=1e-3)
+
+
+# Test: Trending posts fall back to the database while the ranking is built
+def test_get_trending_posts_building(
+    authorized_client: TestClient, test_posts: list[Post]
+) -> None:
+    redis = Redis(host=settings.REDIS_HOSTNAME, port=settings.REDIS_PORT)
+
+    # Given: another worker is building the ranking
+    redis.delete(trending_posts.epoch_key)
+    redis.set(trending_posts.lock_key, "other-worker", ex=60)
+
+    res = authorized_client.get("/api/v1/posts/trending")
+    assert res.status_code == 200
+    assert len(res.json()) == len(test_posts)
+
+    # And: its lock is left alone
+    assert redis.get(trending_posts.lock_key) == b"other-worker"
+    redis.delete(trending_posts.lock_key)
+
+
+# Test: include=my_vote should flag the posts voted by the current user
+def test_get_posts_include_my_vote(
+    authorized_client: TestClient, test_posts: list[Post]
+) -> None:
+    post_ids = [post.id for post in test_posts]
+    res = authorized_client.post(
+        "/api/v1/votes/", json={"post_id": post_ids[1], "dir": 1}
+    )
+    assert res.status_code == 201
+
+    res = authorized_client.get("/api/v1/posts/")
+    assert res.status_code == 200
+    assert all("my_vote" not in post for post in res.json())
+
+    # Served from the database first, then from the shared cached page
+    for _ in range(2):
+        res = authorized_client.get("/api/v1/posts/", params={"include": "my_vote"})
+        logging.debug(res.json())
+        assert res.status_code == 200
+        my_votes = {post["Post"]["id"]: post["my_vote"] for post in res.json()}
+        assert my_votes == {post_id: post_id == post_ids[1] for post_id in post_ids}
+
+    for _ in range(2):
+        res = authorized_client.get(
+            f"/api/v1/posts/{post_ids[1]}", params={"include": "my_vote"}
+        )
+        assert res.status_code == 200
+        assert res.json()["my_vote"] is True
+
+    res = authorized_client.get(f"/api/v1/posts/{post_ids[1]}")
+    assert "my_vote" not in res.json()
+
+    res = authorized_client.get("/api/v1/posts/", params={"include": "invalid"})
+    assert res.status_code == 422
+
+
+@pytest.fixture
+def read_replica(monkeypatch: pytest.MonkeyPatch) -> Generator[ReplicaRouter]:
+    # The test database doubles as the replica
+    router = ReplicaRouter([f"{settings.SQLALCHEMY_DATABASE_URI}"])
+    monkeypatch.setattr(replicas, "replicas", router)
+    monkeypatch.setattr(deps, "replicas", router)
+    yield router
+    router.engines[0].dispose()
+
+
+# Test: Reads go to the replica, except right after the user's own write
+def test_get_posts_read_replica(
+    authorized_client: TestClient,
+    test_posts: list[Post],
+    read_replica: ReplicaRouter,
+) -> None:
+    pool = read_replica.engines[0].pool
+    assert isinstance(pool, InstrumentedQueuePool)
+
+    res = authorized_client.get("/api/v1/posts/")
+    assert res.status_code == 200
+    assert len(res.json()) == len(test_posts)
+    assert pool.checkouts > 0
+    # Pages read from a (possibly lagging) replica are not cached
+    redis = Redis(host=settings.REDIS_HOSTNAME, port=settings.REDIS_PORT)
+    assert not list(redis.scan_iter("posts:all*"))
+    assert authorized_client.get("/api/v1/posts/trending").status_code == 200
+    assert not list(redis.scan_iter("posts:[0-9]*"))
+    checkouts = pool.checkouts
+
+    res = authorized_client.post(
+        "/api/v1/posts/", json={"title": "new title", "content": "new content"}
+    )
+    assert res.status_code == 201
+
+    res = authorized_client.get("/api/v1/posts/", params={"search": "new title"})
+    assert res.status_code == 200
+    assert [post["Post"]["title"] for post in res.json()] == ["new title"]
+    assert pool.checkouts == checkouts
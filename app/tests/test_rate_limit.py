@@ -0,0 +1,102 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.middlewares import RateLimitMiddleware
+
+
+# Fixture: Enable rate limiting with a burst of 2 requests and a slow refill
+@pytest.fixture()
+def rate_limit(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(settings, "RATE_LIMIT_BURST", 2)
+    monkeypatch.setattr(settings, "RATE_LIMIT_PER_SECOND", 0.01)
+    # Each test client runs its own event loop, the Redis connections of the
+    # previous one fail once and must not keep the app on local buckets
+    monkeypatch.setattr(settings, "RATE_LIMIT_REDIS_COOLDOWN", 0.0)
+
+
+# Test: Requests over the burst should get 429 with rate limit headers
+@pytest.mark.usefixtures("rate_limit")
+def test_rate_limit_exceeded(authorized_client: TestClient) -> None:
+    for remaining in ("1", "0"):
+        res = authorized_client.get("/api/v1/posts/")
+        assert res.status_code == 200
+        assert res.headers["RateLimit-Limit"] == "2"
+        assert res.headers["RateLimit-Remaining"] == remaining
+
+    res = authorized_client.get("/api/v1/posts/")
+    assert res.status_code == 429
+    assert res.json() == {"detail": "Too many requests"}
+    assert int(res.headers["Retry-After"]) > 0
+    assert res.headers["RateLimit-Remaining"] == "0"
+
+    # Other routes have their own bucket
+    res = authorized_client.get("/api/v1/users/")
+    assert res.status_code == 200
+
+
+# Test: Each user has its own bucket, anonymous clients are limited by IP
+@pytest.mark.usefixtures("rate_limit")
+def test_rate_limit_per_client(
+    authorized_client: TestClient, client: TestClient
+) -> None:
+    for _ in range(2):
+        assert authorized_client.get("/api/v1/posts/").status_code == 200
+    assert authorized_client.get("/api/v1/posts/").status_code == 429
+
+    client.headers.pop("Authorization")
+    res = client.get("/api/v1/posts/")
+    assert res.status_code == 401
+    assert res.headers["RateLimit-Remaining"] == "1"
+
+
+# Test: Exempt paths are not limited
+@pytest.mark.usefixtures("rate_limit")
+def test_rate_limit_exempt_path(client: TestClient) -> None:
+    for _ in range(3):
+        res = client.get("/health")
+        assert res.status_code == 200
+        assert "RateLimit-Limit" not in res.headers
+
+
+# Test: Requests are limited in process when Redis is unavailable
+@pytest.mark.usefixtures("rate_limit")
+def test_rate_limit_local_fallback(
+    authorized_client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    async def redis_down(**_kwargs: object) -> None:
+        raise ConnectionError("Redis is down")
+
+    monkeypatch.setattr(RateLimitMiddleware, "token_bucket_script", redis_down)
+
+    for _ in range(2):
+        assert authorized_client.get("/api/v1/posts/").status_code == 200
+    assert authorized_client.get("/api/v1/posts/").status_code == 429
+
+
+# Test: Redis is skipped during the cooldown following an error
+def test_rate_limit_redis_cooldown(monkeypatch: pytest.MonkeyPatch) -> None:
+    calls = 0
+
+    async def redis_down(**_kwargs: object) -> None:
+        nonlocal calls
+        calls += 1
+        raise ConnectionError("Redis is down")
+
+    middleware = RateLimitMiddleware(app=None)  # type: ignore[arg-type]
+    monkeypatch.setattr(middleware, "token_bucket_script", redis_down)
+
+    async def take() -> tuple[bool, float]:
+        return await middleware.take("ratelimit:test", capacity=2, rate=0.01)
+
+    assert asyncio.run(take())[0]
+    assert asyncio.run(take())[0]
+    assert not asyncio.run(take())[0]
+    assert calls == 1
+
+    middleware.redis_retry_at = 0.0
+    asyncio.run(take())
+    assert calls == 2
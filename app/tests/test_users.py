@@ -3,6 +3,8 @@ from typing import Any
 
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.orm import Session
 
 from app.models import User
 from app.schemas import UserOut
@@ -121,3 +123,45 @@ def test_get_user(
         data = res.json()
         validate(data)
         logging.debug(data)
+
+
+# Test: A user created after a missing lookup should not be hidden by the cache
+@pytest.mark.usefixtures("test_user")
+def test_get_user_after_missing_lookup(authorized_client: TestClient) -> None:
+    res = authorized_client.get("/api/v1/users/2")
+    assert res.status_code == 404
+
+    res = authorized_client.post(
+        "/api/v1/users/", json={"email": "abc2@test.com", "password": "abc123"}
+    )
+    assert res.status_code == 201
+    user_id = res.json()["id"]
+
+    res = authorized_client.get(f"/api/v1/users/{user_id}")
+    logging.debug(res.json())
+    assert res.status_code == 200
+
+
+# Test: Authenticated users are cached, so requests skip the users lookup
+def test_get_me_cached_user(
+    authorized_client: TestClient, test_user: User, session: Session
+) -> None:
+    res = authorized_client.get("/api/v1/users/me")
+    assert res.status_code == 200
+
+    statements: list[str] = []
+
+    def record(*args: Any) -> None:
+        statements.append(args[2])
+
+    engine = session.get_bind()
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        res = authorized_client.get("/api/v1/users/me")
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    logging.debug(statements)
+    assert res.status_code == 200
+    assert res.json()["email"] == test_user.email
+    assert statements == []
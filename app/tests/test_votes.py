@@ -2,9 +2,14 @@ import logging
 
 import pytest
 from fastapi.testclient import TestClient
+from redis import Redis
+from redis.exceptions import RedisError
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.models import Post, User, Vote
+from app.services.vote_buffer import vote_buffer
 
 
 # Fixture: Create a vote for the first post and test user
@@ -55,10 +60,14 @@ def test_delete_vote_non_exist(
 
 
 # Test: Voting on a non-existent post should return 404
-def test_vote_post_non_exist(authorized_client: TestClient) -> None:
-    res = authorized_client.post("/api/v1/votes/", json={"post_id": 9999999, "dir": 0})
+@pytest.mark.parametrize("dir", [0, 1])
+def test_vote_post_non_exist(authorized_client: TestClient, dir: int) -> None:
+    res = authorized_client.post(
+        "/api/v1/votes/", json={"post_id": 9999999, "dir": dir}
+    )
     logging.debug(res.json())
     assert res.status_code == 404
+    assert res.json()["detail"] == "Post not found"
 
 
 # Test: Unauthorized user should not be able to vote
@@ -66,3 +75,117 @@ def test_vote_unauthorized_user(client: TestClient, test_posts: list[Post]) -> N
     res = client.post("/api/v1/votes/", json={"post_id": test_posts[0].id, "dir": 1})
     logging.debug(res.json())
     assert res.status_code == 401
+
+
+# Test: Voting should update the votes of an already fetched post and list page
+def test_vote_updates_fetched_votes(
+    authorized_client: TestClient, test_posts: list[Post]
+) -> None:
+    post_id = test_posts[0].id
+    res = authorized_client.get(f"/api/v1/posts/{post_id}")
+    assert res.json()["votes"] == 0
+    res = authorized_client.get("/api/v1/posts/")
+    assert res.json()[0]["votes"] == 0
+
+    res = authorized_client.post("/api/v1/votes/", json={"post_id": post_id, "dir": 1})
+    assert res.status_code == 201
+
+    res = authorized_client.get(f"/api/v1/posts/{post_id}")
+    assert res.json()["votes"] == 1
+    res = authorized_client.get("/api/v1/posts/")
+    assert res.json()[0]["votes"] == 1
+
+    res = authorized_client.post("/api/v1/votes/", json={"post_id": post_id, "dir": 0})
+    assert res.status_code == 204
+
+    res = authorized_client.get(f"/api/v1/posts/{post_id}")
+    assert res.json()["votes"] == 0
+    res = authorized_client.get("/api/v1/posts/")
+    assert res.json()[0]["votes"] == 0
+
+
+# Test: Rebuilt list pages overwrite stale cached vote counts
+def test_list_page_reseeds_stale_votes(
+    authorized_client: TestClient, test_posts: list[Post]
+) -> None:
+    try:
+        redis = Redis(host=settings.REDIS_HOSTNAME, port=settings.REDIS_PORT)
+        redis.ping()
+    except RedisError:
+        pytest.skip("Redis is not available")
+
+    post_id = test_posts[0].id
+    res = authorized_client.get("/api/v1/posts/")
+    assert res.json()[0]["votes"] == 0
+
+    # Given: a stale count (e.g. seeded from a lagging replica)
+    redis.hset("posts:votes", str(post_id), 5)
+    for key in redis.scan_iter("posts:all*"):
+        redis.delete(key)
+
+    # When: the page is rebuilt from the database
+    res = authorized_client.get("/api/v1/posts/")
+    assert res.json()[0]["votes"] == 0
+
+    # Then: the cached page serves the corrected count
+    res = authorized_client.get("/api/v1/posts/")
+    assert res.json()[0]["votes"] == 0
+
+
+# Fixture: Enable the write-behind vote buffer (requires Redis)
+@pytest.fixture()
+def write_behind(monkeypatch: pytest.MonkeyPatch) -> None:
+    try:
+        Redis(host=settings.REDIS_HOSTNAME, port=settings.REDIS_PORT).ping()
+    except RedisError:
+        pytest.skip("Redis is not available")
+    monkeypatch.setattr(settings, "VOTES_WRITE_BEHIND", True)
+
+
+def count_votes(session: Session, post_id: int) -> int:
+    session.expire_all()
+    stmt = select(func.count()).select_from(Vote).where(Vote.post_id == post_id)
+    return session.execute(stmt).scalars().one()
+
+
+# Test: Buffered votes are served from Redis and flushed to the database
+@pytest.mark.usefixtures("write_behind", "test_vote")
+def test_buffered_votes_flush(
+    authorized_client: TestClient, test_posts: list[Post], session: Session
+) -> None:
+    post_id, voted_post_id = test_posts[1].id, test_posts[0].id
+    portal = authorized_client.portal
+    assert portal is not None
+
+    res = authorized_client.post("/api/v1/votes/", json={"post_id": post_id, "dir": 1})
+    assert res.status_code == 201
+    res = authorized_client.post("/api/v1/votes/", json={"post_id": post_id, "dir": 1})
+    assert res.status_code == 409
+    res = authorized_client.post(
+        "/api/v1/votes/", json={"post_id": voted_post_id, "dir": 0}
+    )
+    assert res.status_code == 204
+
+    res = authorized_client.get(f"/api/v1/posts/{post_id}")
+    assert res.json()["votes"] == 1
+    assert count_votes(session, post_id) == 0
+
+    res = authorized_client.get("/api/v1/posts/", params={"include": "my_vote"})
+    my_votes = {post["Post"]["id"]: post["my_vote"] for post in res.json()}
+    assert my_votes[post_id] is True
+    assert my_votes[voted_post_id] is False
+
+    assert portal.call(vote_buffer.flush) == 2
+    assert count_votes(session, post_id) == 1
+    assert count_votes(session, voted_post_id) == 0
+    assert portal.call(vote_buffer.reconcile) == 0
+
+    res = authorized_client.post("/api/v1/votes/", json={"post_id": post_id, "dir": 1})
+    assert res.status_code == 409
+
+
+# Test: Buffered votes on a non-existent post should return 404
+@pytest.mark.usefixtures("write_behind")
+def test_buffered_vote_post_non_exist(authorized_client: TestClient) -> None:
+    res = authorized_client.post("/api/v1/votes/", json={"post_id": 9999999, "dir": 1})
+    assert res.status_code == 404
@@ -0,0 +1,55 @@
+import pytest
+
+from app.api.deps import CommonFilterParams
+from app.services.cache import CacheService
+
+
+# Test sort_fields strips whitespace, drops empty and repeated fields
+@pytest.mark.parametrize(
+    "sort_by, expected",
+    [
+        (None, []),
+        ("", []),
+        ("title", ["title"]),
+        ("title,", ["title"]),
+        (" title , -content ", ["title", "-content"]),
+        ("title,-title", ["title"]),
+        ("-id,title", ["-id"]),
+        (",,", []),
+    ],
+)
+def test_sort_fields_normalization(sort_by: str | None, expected: list[str]) -> None:
+    assert CommonFilterParams(sort_by=sort_by).sort_fields == expected
+
+
+# Test equivalent filters produce the same canonical params
+@pytest.mark.parametrize(
+    "params",
+    [
+        {},
+        {"sort_by": "id"},
+        {"sort_by": "id,"},
+        {"sort_by": ""},
+        {"search": ""},
+        {"offset": 0, "limit": 100},
+    ],
+)
+def test_cache_params_default_elision(params: dict[str, object]) -> None:
+    assert CommonFilterParams(**params).cache_params() == {}
+
+
+# Test search is case folded in the canonical params
+def test_cache_params_search_case_folding() -> None:
+    upper = CommonFilterParams(search="Foo").cache_params()
+    lower = CommonFilterParams(search="foo").cache_params()
+    assert upper == lower == {"search": "foo"}
+
+
+# Test build_key returns fixed-length keys regardless of params order
+def test_build_key_is_canonical() -> None:
+    key_1 = CacheService.build_key("posts:all", {"limit": 10, "search": "foo"})
+    key_2 = CacheService.build_key("posts:all", {"search": "foo", "limit": 10})
+    key_3 = CacheService.build_key("posts:all", {"search": "x" * 1000})
+    assert key_1 == key_2
+    assert key_1.startswith("posts:all:")
+    assert len(key_1) == len(key_3)
@@ -0,0 +1,67 @@
+import asyncio
+import contextlib
+import time
+from typing import Any
+
+import pytest
+from loguru import logger
+
+from app.core.config import settings
+from app.core.loop_monitor import LoopMonitor
+
+
+async def blocking_handler(scope: dict[str, Any]) -> None:
+    assert scope["type"] == "http"
+    await asyncio.sleep(0.05)
+    time.sleep(0.3)  # Blocks the event loop
+    await asyncio.sleep(0.05)
+
+
+# Test: blocking the event loop logs the request and the stack, once per stall
+def test_loop_monitor_reports_blocking(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "LOOP_MONITOR_INTERVAL", 0.01)
+    monkeypatch.setattr(settings, "LOOP_BLOCK_THRESHOLD", 0.1)
+    messages: list[str] = []
+    handler_id = logger.add(messages.append, level="WARNING")
+
+    async def run() -> None:
+        monitor = asyncio.create_task(LoopMonitor().run())
+        await asyncio.sleep(0.05)
+        scope = {"type": "http", "method": "GET", "path": "/api/v1/posts/12"}
+        await blocking_handler(scope)
+        await asyncio.sleep(0.05)
+        monitor.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await monitor
+
+    try:
+        asyncio.run(run())
+    finally:
+        logger.remove(handler_id)
+
+    assert len(messages) == 1
+    assert "Event loop blocked" in messages[0]
+    assert "GET /api/v1/posts/12" in messages[0]
+    assert "in blocking_handler" in messages[0]
+
+
+# Test: awaiting handlers are not reported
+def test_loop_monitor_quiet(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "LOOP_MONITOR_INTERVAL", 0.01)
+    monkeypatch.setattr(settings, "LOOP_BLOCK_THRESHOLD", 0.1)
+    messages: list[str] = []
+    handler_id = logger.add(messages.append, level="WARNING")
+
+    async def run() -> None:
+        monitor = asyncio.create_task(LoopMonitor().run())
+        await asyncio.sleep(0.3)
+        monitor.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await monitor
+
+    try:
+        asyncio.run(run())
+    finally:
+        logger.remove(handler_id)
+
+    assert not messages
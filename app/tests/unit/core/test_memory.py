@@ -0,0 +1,26 @@
+import pytest
+
+from app.core.config import settings
+from app.core.memory import MemoryProfiler, SnapshotNotFound, TracingNotStarted
+
+
+# Test: only the last MEMORY_MAX_SNAPSHOTS snapshots are kept
+def test_snapshots_rotation(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "MEMORY_MAX_SNAPSHOTS", 2)
+    profiler = MemoryProfiler()
+    with pytest.raises(TracingNotStarted):
+        profiler.take_snapshot()
+
+    profiler.start(1)
+    try:
+        ids = [profiler.take_snapshot().id for _ in range(3)]
+    finally:
+        profiler.stop()
+
+    assert [stored.id for stored in profiler.snapshots] == ids[1:]
+    with pytest.raises(SnapshotNotFound):
+        profiler.get(ids[0])
+    # The first snapshot kept has nothing to diff against
+    with pytest.raises(SnapshotNotFound):
+        profiler.diff(ids[1], None, "lineno", 10)
+    assert isinstance(profiler.diff(ids[2], None, "filename", 10), list)
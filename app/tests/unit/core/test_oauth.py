@@ -5,6 +5,7 @@ from authlib.jose.errors import BadSignatureError, ExpiredTokenError
 from fastapi import HTTPException, status
 
 from app.core import oauth
+from app.services.token_cache import TokenCache
 
 
 # Mock settings values
@@ -110,3 +111,20 @@ def test_get_current_user_user_not_found(monkeypatch: pytest.MonkeyPatch) -> Non
         oauth.get_current_user(token="token", db=mock_db)
     assert excinfo.value.status_code == status.HTTP_401_UNAUTHORIZED
     mock_payload.validate.assert_called_once()
+
+
+# Test get_current_user verifies a token once and reuses the cached claims
+def test_get_current_user_caches_verified_token(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(oauth, "token_cache", TokenCache(maxsize=10))
+    token = oauth.create_access_token({"sub": 1})
+    decode = MagicMock(wraps=oauth.jwt.decode)
+    monkeypatch.setattr(oauth.jwt, "decode", decode)
+
+    mock_user = MagicMock()
+    mock_db = MagicMock()
+    mock_db.execute.return_value.scalars.return_value.first.return_value = mock_user
+    assert oauth.get_current_user(token=token, db=mock_db) is mock_user
+    assert oauth.get_current_user(token=token, db=mock_db) is mock_user
+    decode.assert_called_once()
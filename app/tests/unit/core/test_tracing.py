@@ -0,0 +1,111 @@
+import asyncio
+from collections.abc import Generator
+
+import httpx
+import pytest
+from opentelemetry import trace
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import (
+    InMemorySpanExporter,
+)
+from opentelemetry.trace import SpanKind
+from sqlalchemy import create_engine, text
+from starlette.types import Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.tracing import start_span
+from app.db import instrumentation  # noqa: F401
+from app.middlewares import TracingMiddleware
+from app.utils import PasswordHasher
+
+exporter = InMemorySpanExporter()
+
+
+@pytest.fixture
+def spans(monkeypatch: pytest.MonkeyPatch) -> Generator[InMemorySpanExporter]:
+    # The global provider can only be set once per process
+    if not isinstance(trace.get_tracer_provider(), TracerProvider):
+        provider = TracerProvider()
+        provider.add_span_processor(SimpleSpanProcessor(exporter))
+        trace.set_tracer_provider(provider)
+    monkeypatch.setattr(settings, "OTEL_ENABLED", True)
+    exporter.clear()
+    yield exporter
+    exporter.clear()
+
+
+# Test: requests get a server span, with the SQL statements and inner spans as children
+def test_request_spans(spans: InMemorySpanExporter) -> None:
+    engine = create_engine("sqlite://")
+
+    async def app(_scope: Scope, _receive: Receive, send: Send) -> None:
+        with start_span("cache.get"), engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    async def run() -> httpx.Response:
+        transport = httpx.ASGITransport(app=TracingMiddleware(app))
+        async with httpx.AsyncClient(transport=transport, base_url="http://t") as c:
+            return await c.get(
+                "/posts",
+                headers={
+                    "traceparent": (
+                        "00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01"
+                    )
+                },
+            )
+
+    assert asyncio.run(run()).status_code == 200
+
+    by_name = {span.name: span for span in spans.get_finished_spans()}
+    assert set(by_name) == {"GET", "cache.get", "SELECT"}
+    server, cache, query = by_name["GET"], by_name["cache.get"], by_name["SELECT"]
+
+    assert server.kind == SpanKind.SERVER
+    assert server.attributes is not None
+    assert server.attributes["http.response.status_code"] == 200
+    # The trace of the caller is continued
+    assert server.context is not None
+    assert server.context.trace_id == 0x0AF7651916CD43DD8448EB211C80319C
+    assert server.parent is not None
+    assert server.parent.span_id == 0xB7AD6B7169203331
+
+    assert cache.parent is not None
+    assert cache.parent.span_id == server.context.span_id
+    assert query.parent is not None
+    assert query.parent.span_id == cache.context.span_id
+    assert query.kind == SpanKind.CLIENT
+    assert query.attributes is not None
+    assert query.attributes["db.query.text"] == "SELECT 1"
+
+
+# Test: bcrypt operations are traced, including the time queued for a worker
+def test_bcrypt_spans(
+    spans: InMemorySpanExporter, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "BCRYPT_ROUNDS", 4)
+    hasher = PasswordHasher(max_workers=1, max_pending=2)
+
+    async def run() -> bool:
+        hashed = await hasher.hash("secret")
+        return await hasher.verify("secret", hashed)
+
+    assert asyncio.run(run())
+    assert [span.name for span in spans.get_finished_spans()] == [
+        "bcrypt.hash",
+        "bcrypt.verify",
+    ]
+
+
+# Test: nothing is recorded while tracing is disabled
+def test_tracing_disabled(
+    spans: InMemorySpanExporter, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "OTEL_ENABLED", False)
+    engine = create_engine("sqlite://")
+    with start_span("cache.get") as span, engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+    assert span is None
+    assert not spans.get_finished_spans()
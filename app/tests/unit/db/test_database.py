@@ -1,7 +1,12 @@
 import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
 
+from app.core.config import settings
 from app.db import database
+from app.db.pool import InstrumentedQueuePool
 
 
 def test_engine_creation() -> None:
@@ -32,3 +37,65 @@ def test_get_db_yields_session() -> None:
     # After closing, generator should raise StopIteration
     with pytest.raises(StopIteration):
         next(gen)
+
+
+def test_engine_options_pooled() -> None:
+    # Pool settings should be passed to the instrumented QueuePool
+    config = settings.model_copy(
+        update={"DB_POOL_SIZE": 7, "DB_MAX_OVERFLOW": 3, "DB_MAX_CONNECTIONS": None}
+    )
+    options = database.engine_options(config)
+    assert options["poolclass"] is InstrumentedQueuePool
+    assert options["pool_size"] == 7
+    assert options["max_overflow"] == 3
+    assert options["pool_pre_ping"] is config.DB_POOL_PRE_PING
+
+
+def test_engine_options_split_between_workers() -> None:
+    # DB_MAX_CONNECTIONS should be split between the workers
+    config = settings.model_copy(
+        update={
+            "DB_POOL_SIZE": 5,
+            "DB_MAX_OVERFLOW": 10,
+            "DB_MAX_CONNECTIONS": 24,
+            "WEB_CONCURRENCY": 4,
+        }
+    )
+    options = database.engine_options(config)
+    assert options["pool_size"] + options["max_overflow"] == 6
+    assert options["pool_size"] == 5
+
+
+def test_engine_options_pool_disabled() -> None:
+    # Pool-less mode should use NullPool without prepared statements
+    config = settings.model_copy(update={"DB_POOL_DISABLED": True})
+    options = database.engine_options(config)
+    assert options["poolclass"] is NullPool
+    assert options["connect_args"] == {"prepare_threshold": None}
+
+
+def test_instrumented_pool_stats() -> None:
+    # Checkouts, saturation and timeouts should be reported
+    engine = create_engine(
+        "sqlite://",
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.01,
+    )
+    pool = engine.pool
+    assert isinstance(pool, InstrumentedQueuePool)
+
+    with engine.connect():
+        stats = pool.stats()
+        assert stats["checked_out"] == 1
+        assert stats["saturation"] == 1.0
+        with pytest.raises(PoolTimeoutError):
+            engine.connect()
+
+    stats = pool.stats()
+    assert stats["checked_out"] == 0
+    assert stats["checkouts"] == 2
+    assert stats["timeouts"] == 1
+    assert stats["wait_seconds_max"] >= 0.01
+    engine.dispose()
@@ -0,0 +1,80 @@
+from collections.abc import Generator
+
+import pytest
+from loguru import logger
+from sqlalchemy import Column, Integer, MetaData, String, Table, create_engine, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.timing import RequestTimings, request_timings
+from app.db import instrumentation  # noqa: F401
+from app.models import Post
+from app.models.encrypted import Encrypted
+
+
+@pytest.fixture
+def slow_queries(monkeypatch: pytest.MonkeyPatch) -> Generator[list[str]]:
+    # Every query counts as slow
+    monkeypatch.setattr(settings, "SLOW_QUERY_THRESHOLD", 1e-9)
+    messages: list[str] = []
+    handler_id = logger.add(messages.append, level="WARNING")
+    yield messages
+    logger.remove(handler_id)
+
+
+# Test: slow queries are logged with their route and redacted parameters
+def test_slow_query_redacts_encrypted(slow_queries: list[str]) -> None:
+    metadata = MetaData()
+    cards = Table(
+        "cards",
+        metadata,
+        Column("id", Integer, primary_key=True),
+        Column("owner", String),
+        Column("number", Encrypted(settings.ENCRYPTION_KEY)),
+    )
+    engine = create_engine("sqlite://")
+    metadata.create_all(engine)
+    slow_queries.clear()
+
+    token = request_timings.set(RequestTimings(route="/api/v1/cards/"))
+    try:
+        with engine.begin() as connection:
+            connection.execute(
+                cards.insert(), {"owner": "owner-1", "number": "4111111111111111"}
+            )
+            connection.execute(
+                cards.insert(),
+                [
+                    {"owner": "owner-2", "number": "4222222222222"},
+                    {"owner": "owner-3", "number": "4333333333333"},
+                ],
+            )
+    finally:
+        request_timings.reset(token)
+
+    assert len(slow_queries) == 2
+    for message in slow_queries:
+        assert "Slow query" in message
+        assert "/api/v1/cards/" in message
+        assert "INSERT INTO cards" in message
+        assert "<redacted>" in message
+        assert "gAAAA" not in message  # Fernet token
+    assert "owner-1" in slow_queries[0]
+    assert "owner-3" in slow_queries[1]
+
+
+# Test: sampled slow SELECTs are logged with their plan, leaving the transaction usable
+def test_slow_query_explain(
+    session: Session, slow_queries: list[str], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "SLOW_QUERY_EXPLAIN_SAMPLE_RATE", 1.0)
+
+    session.execute(select(Post).where(Post.title == "title")).all()
+    assert len(slow_queries) == 1
+    assert "SELECT posts" in slow_queries[0]
+    assert "Execution Time" in slow_queries[0]
+
+    monkeypatch.setattr(settings, "SLOW_QUERY_EXPLAIN_SAMPLE_RATE", 0.0)
+    session.execute(select(Post)).all()
+    assert len(slow_queries) == 2
+    assert "Execution Time" not in slow_queries[1]
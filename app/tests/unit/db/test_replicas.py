@@ -0,0 +1,80 @@
+import time
+from pathlib import Path
+
+import pytest
+
+from app.core.config import settings
+from app.db.replicas import RecentWrites, ReplicaRouter
+
+
+def sqlite_url(tmp_path: Path, name: str) -> str:
+    return f"sqlite:///{tmp_path / name}"
+
+
+# Test: sessions are opened on the replicas in turn
+def test_session_round_robin(tmp_path: Path) -> None:
+    router = ReplicaRouter([sqlite_url(tmp_path, "a.db"), sqlite_url(tmp_path, "b.db")])
+
+    indexes = []
+    for _ in range(4):
+        db = router.session()
+        assert db is not None
+        indexes.append(db.info["replica"])
+        db.close()
+
+    assert indexes == [0, 1, 0, 1]
+
+
+# Test: unhealthy replicas are skipped until they recover
+def test_session_skips_unhealthy(tmp_path: Path) -> None:
+    router = ReplicaRouter([sqlite_url(tmp_path, "a.db"), sqlite_url(tmp_path, "b.db")])
+    router.mark_unhealthy(0)
+
+    for _ in range(3):
+        db = router.session()
+        assert db is not None
+        assert db.info["replica"] == 1
+        db.close()
+
+    router.mark_unhealthy(1)
+    assert router.session() is None
+
+    router.mark_healthy(0)
+    db = router.session()
+    assert db is not None
+    assert db.info["replica"] == 0
+    db.close()
+
+
+# Test: the health check marks unreachable replicas as unhealthy
+def test_check_marks_unreachable_replica(tmp_path: Path) -> None:
+    router = ReplicaRouter(
+        [sqlite_url(tmp_path, "a.db"), sqlite_url(tmp_path, "missing/b.db")]
+    )
+
+    router.check()
+
+    for _ in range(2):
+        db = router.session()
+        assert db is not None
+        assert db.info["replica"] == 0
+        db.close()
+
+
+# Test: without replica URLs routing is disabled
+def test_router_disabled() -> None:
+    router = ReplicaRouter([])
+    assert not router.enabled
+    assert router.session() is None
+
+
+# Test: expired writes are pruned from the process, even if never read
+def test_recent_writes_pruned(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "DB_READ_YOUR_WRITES_WINDOW", 0.01)
+    recent_writes = RecentWrites()
+    for user_id in range(100):
+        recent_writes.record(user_id)
+    time.sleep(0.02)
+
+    recent_writes.record(100)
+    assert list(recent_writes._local) == [100]
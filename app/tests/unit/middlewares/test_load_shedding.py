@@ -0,0 +1,76 @@
+import asyncio
+
+import httpx
+import pytest
+from starlette.types import Receive, Scope, Send
+
+from app.core.config import settings
+from app.middlewares import LoadSheddingMiddleware
+from app.middlewares.load_shedding import ConcurrencyLimit
+
+
+# Test slots are handed over in order and waiters over the queue are rejected
+def test_concurrency_limit_queue() -> None:
+    async def run() -> None:
+        limit = ConcurrencyLimit(limit=1, max_queue=1)
+        assert await limit.acquire(timeout=0.1)
+
+        waiter = asyncio.ensure_future(limit.acquire(timeout=1))
+        await asyncio.sleep(0)
+        assert limit.queued == 1
+        assert not await limit.acquire(timeout=1)  # Queue is full
+
+        limit.release()
+        assert await waiter
+        assert limit.active == 1
+        limit.release()
+        assert limit.active == 0
+
+    asyncio.run(run())
+
+
+# Test waiters give up after the timeout without leaking slots
+def test_concurrency_limit_timeout() -> None:
+    async def run() -> None:
+        limit = ConcurrencyLimit(limit=1, max_queue=10)
+        assert await limit.acquire(timeout=0.1)
+        assert not await limit.acquire(timeout=0.01)
+        assert limit.queued == 0
+
+        limit.release()
+        assert limit.active == 0
+        assert await limit.acquire(timeout=0)
+
+    asyncio.run(run())
+
+
+# Test requests over the limits get 503, per route class and globally
+def test_load_shedding_middleware(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "LOAD_SHED_ENABLED", True)
+    monkeypatch.setattr(settings, "LOAD_SHED_MAX_CONCURRENCY", 3)
+    monkeypatch.setattr(settings, "LOAD_SHED_MAX_QUEUE", 10)
+    monkeypatch.setattr(settings, "LOAD_SHED_QUEUE_TIMEOUT", 0.05)
+    monkeypatch.setattr(settings, "LOAD_SHED_ROUTE_CLASSES", {"auth": ["/login"]})
+    monkeypatch.setattr(settings, "LOAD_SHED_CLASS_LIMITS", {"auth": 1})
+
+    release = asyncio.Event()
+
+    async def slow_app(_scope: Scope, _receive: Receive, send: Send) -> None:
+        await release.wait()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    async def run() -> list[int]:
+        transport = httpx.ASGITransport(app=LoadSheddingMiddleware(slow_app))
+        async with httpx.AsyncClient(transport=transport, base_url="http://t") as c:
+            paths = ["/login", "/login", "/posts", "/posts", "/posts"]
+            requests = [asyncio.ensure_future(c.get(path)) for path in paths]
+            await asyncio.sleep(0.2)
+            release.set()
+            responses = await asyncio.gather(*requests)
+            shed = [r for r in responses if r.status_code == 503]
+            assert all(r.headers["Retry-After"] == "1" for r in shed)
+            return [r.status_code for r in responses]
+
+    # One auth request at a time, three requests in flight
+    assert asyncio.run(run()) == [200, 503, 200, 200, 503]
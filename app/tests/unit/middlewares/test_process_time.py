@@ -0,0 +1,30 @@
+import asyncio
+from collections.abc import AsyncIterator
+
+import httpx
+from starlette.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+from app.middlewares import ProcessTimeHeaderMiddleware
+
+
+# Test the process time header is added and streaming responses pass through
+def test_process_time_header_streaming() -> None:
+    async def chunks() -> AsyncIterator[bytes]:
+        for chunk in (b"a", b"b", b"c"):
+            await asyncio.sleep(0.01)
+            yield chunk
+
+    async def app(scope: Scope, receive: Receive, send: Send) -> None:
+        await StreamingResponse(chunks())(scope, receive, send)
+
+    async def run() -> tuple[httpx.Response, list[bytes]]:
+        transport = httpx.ASGITransport(app=ProcessTimeHeaderMiddleware(app))
+        async with httpx.AsyncClient(transport=transport, base_url="http://t") as c:
+            async with c.stream("GET", "/") as res:
+                return res, [chunk async for chunk in res.aiter_raw()]
+
+    res, body = asyncio.run(run())
+    assert res.status_code == 200
+    assert 0 <= float(res.headers["X-Process-Time"]) < 1
+    assert b"".join(body) == b"abc"
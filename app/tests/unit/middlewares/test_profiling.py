@@ -0,0 +1,86 @@
+import asyncio
+import json
+from pathlib import Path
+
+import httpx
+import pytest
+from starlette.types import Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.oauth import create_access_token
+from app.middlewares import ProfilingMiddleware
+
+
+async def app(_scope: Scope, _receive: Receive, send: Send) -> None:
+    await asyncio.sleep(0.01)
+    await send({"type": "http.response.start", "status": 201, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+def get(
+    paths: list[str], headers: dict[str, str] | None = None
+) -> list[httpx.Response]:
+    async def run() -> list[httpx.Response]:
+        transport = httpx.ASGITransport(app=ProfilingMiddleware(app))
+        async with httpx.AsyncClient(transport=transport, base_url="http://t") as c:
+            return [await c.get(path, headers=headers) for path in paths]
+
+    return asyncio.run(run())
+
+
+def auth_headers(user_id: int, profile: str) -> dict[str, str]:
+    # Admins are told apart by id, the (unverified) email does not matter
+    token = create_access_token({"sub": user_id, "email": "admin@test.com"})
+    return {"Authorization": f"Bearer {token}", "X-Profile": profile}
+
+
+@pytest.fixture(autouse=True)
+def admins(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "ADMIN_USER_IDS", [1])
+
+
+# Test admins get the profile of their request instead of the response
+def test_profile_on_demand() -> None:
+    (res,) = get(["/posts"], auth_headers(1, "1"))
+    assert res.status_code == 200
+    assert res.headers["X-Profile-Status"] == "201"
+    assert "speedscope" in res.json()["$schema"]
+
+    (res,) = get(["/posts"], auth_headers(1, "html"))
+    assert res.headers["content-type"].startswith("text/html")
+
+
+# Test the profile header is ignored for other users
+def test_profile_not_admin() -> None:
+    for headers in (auth_headers(2, "1"), {"X-Profile": "1"}):
+        (res,) = get(["/posts"], headers)
+        assert res.status_code == 201
+        assert res.text == "ok"
+
+
+# Test sampled requests are profiled to the directory, keeping the last files
+def test_profile_sampled(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "PROFILING_SAMPLE_RATE", 2)
+    monkeypatch.setattr(settings, "PROFILING_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "PROFILING_MAX_FILES", 2)
+
+    responses = get([f"/posts/{i}" for i in range(1, 9)])
+    assert all(res.text == "ok" for res in responses)
+
+    profiles = sorted(tmp_path.iterdir())
+    assert len(profiles) == 2
+    assert "-GET-posts_8-" in profiles[-1].name
+    assert "speedscope" in json.loads(profiles[-1].read_text())["$schema"]
+
+
+# Test revoked admin tokens cannot profile
+def test_profile_revoked_token(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "TOKEN_REVOCATION_ENABLED", True)
+
+    async def revoked(_claims: dict[str, object]) -> bool:
+        return True
+
+    monkeypatch.setattr("app.middlewares.profiling.is_token_revoked", revoked)
+    (res,) = get(["/posts"], auth_headers(1, "1"))
+    assert res.status_code == 201
+    assert res.text == "ok"
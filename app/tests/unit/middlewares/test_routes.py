@@ -0,0 +1,26 @@
+from typing import Any
+
+import pytest
+
+from app.main import app
+from app.middlewares.routes import get_route_template
+
+
+def make_scope(method: str, path: str) -> dict[str, Any]:
+    return {"type": "http", "method": method, "path": path, "app": app}
+
+
+# Test route templates are resolved from the raw path before routing
+@pytest.mark.parametrize(
+    "method, path, expected",
+    [
+        ("GET", "/api/v1/posts/", "/api/v1/posts/"),
+        ("GET", "/api/v1/posts/12", "/api/v1/posts/{id}"),
+        ("GET", "/api/v1/posts/trending", "/api/v1/posts/trending"),
+        ("DELETE", "/api/v1/posts/12", "/api/v1/posts/{id}"),
+        ("GET", "/health", "/health"),
+        ("GET", "/not/a/route", "/not/a/route"),
+    ],
+)
+def test_get_route_template(method: str, path: str, expected: str) -> None:
+    assert get_route_template(make_scope(method, path)) == expected
@@ -0,0 +1,64 @@
+import asyncio
+import re
+
+import httpx
+import pytest
+from loguru import logger
+from sqlalchemy import create_engine, text
+from starlette.types import Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.timing import measure, request_timings
+from app.db import instrumentation  # noqa: F401
+from app.middlewares import ServerTimingMiddleware
+
+
+def run_request(queries: int) -> httpx.Response:
+    engine = create_engine("sqlite://")
+
+    async def app(_scope: Scope, _receive: Receive, send: Send) -> None:
+        with engine.connect() as connection:
+            for _ in range(queries):
+                connection.execute(text("SELECT 1"))
+        with measure("cache"):
+            await asyncio.sleep(0.01)
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    async def run() -> httpx.Response:
+        transport = httpx.ASGITransport(app=ServerTimingMiddleware(app))
+        async with httpx.AsyncClient(transport=transport, base_url="http://t") as c:
+            return await c.get("/posts")
+
+    return asyncio.run(run())
+
+
+# Test the Server-Timing header reports the queries and each segment
+def test_server_timing_header() -> None:
+    res = run_request(queries=3)
+
+    header = res.headers["Server-Timing"]
+    assert 'desc="3 queries"' in header
+    durations = dict(re.findall(r"(\w+);dur=([\d.]+)", header))
+    assert set(durations) == {"db", "cache", "auth", "total"}
+    assert float(durations["cache"]) >= 10
+    assert float(durations["auth"]) == 0
+    assert float(durations["total"]) >= float(durations["cache"])
+    # Timings do not leak out of the request
+    assert request_timings.get() is None
+
+
+# Test requests over the query budget are logged
+def test_query_budget_warning(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "QUERY_COUNT_BUDGET", 2)
+    messages: list[str] = []
+    handler_id = logger.add(messages.append, level="WARNING")
+    try:
+        run_request(queries=2)
+        assert not messages
+        run_request(queries=5)
+    finally:
+        logger.remove(handler_id)
+
+    assert len(messages) == 1
+    assert "5 queries" in messages[0]
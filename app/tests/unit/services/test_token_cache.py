@@ -0,0 +1,49 @@
+import time
+
+import pytest
+
+from app.services.token_cache import TokenCache
+
+
+# Test cached claims are returned until the token expires
+def test_token_cache_get_set() -> None:
+    cache = TokenCache(maxsize=10)
+    claims = {"sub": 1, "exp": time.time() + 60}
+    assert cache.get("token") is None
+
+    cache.set("token", claims)
+    assert cache.get("token") == claims
+    assert cache.get("other") is None
+
+
+# Test expired tokens and tokens without a numeric exp are not cached
+def test_token_cache_skips_expired_tokens() -> None:
+    cache = TokenCache(maxsize=10)
+    cache.set("expired", {"sub": 1, "exp": time.time() - 1})
+    cache.set("no_exp", {"sub": 1})
+    cache.set("invalid_exp", {"sub": 1, "exp": "tomorrow"})
+    assert cache.get("expired") is None
+    assert cache.get("no_exp") is None
+    assert cache.get("invalid_exp") is None
+
+
+# Test tokens that expire while cached are dropped
+def test_token_cache_drops_expired_entries(monkeypatch: pytest.MonkeyPatch) -> None:
+    cache = TokenCache(maxsize=10)
+    now = time.time()
+    cache.set("token", {"sub": 1, "exp": now + 60})
+    monkeypatch.setattr(time, "time", lambda: now + 61)
+    assert cache.get("token") is None
+
+
+# Test the least recently used token is evicted when the cache is full
+def test_token_cache_evicts_least_recently_used() -> None:
+    cache = TokenCache(maxsize=2)
+    exp = time.time() + 60
+    cache.set("a", {"sub": 1, "exp": exp})
+    cache.set("b", {"sub": 2, "exp": exp})
+    assert cache.get("a") is not None
+    cache.set("c", {"sub": 3, "exp": exp})
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
@@ -0,0 +1,87 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.core.config import settings
+from app.utils import (
+    PasswordHasher,
+    PasswordHasherBusy,
+    get_password_hash,
+    password_needs_rehash,
+    verify_password,
+)
+
+
+# Test the async hasher produces hashes that verify_password accepts
+def test_password_hasher_hash_and_verify() -> None:
+    hasher = PasswordHasher(max_workers=1)
+
+    async def run() -> tuple[str, bool, bool]:
+        hashed = await hasher.hash("secret")
+        return (
+            hashed,
+            await hasher.verify("secret", hashed),
+            await hasher.verify("wrong", hashed),
+        )
+
+    hashed, valid, invalid = asyncio.run(run())
+    assert verify_password("secret", hashed)
+    assert valid is True
+    assert invalid is False
+    assert hasher.pending == 0
+
+
+# Test operations over the worker limit wait in the queue
+def test_password_hasher_queue_depth() -> None:
+    hasher = PasswordHasher(max_workers=1)
+    release = threading.Event()
+
+    def blocked(_value: str) -> str:
+        release.wait(5)
+        return _value
+
+    async def run() -> list[str]:
+        tasks = [asyncio.ensure_future(hasher._run(blocked, str(i))) for i in range(3)]
+        await asyncio.sleep(0.05)
+        assert hasher.pending == 3
+        assert hasher.queued == 2
+        release.set()
+        return list(await asyncio.gather(*tasks))
+
+    assert asyncio.run(run()) == ["0", "1", "2"]
+    assert hasher.pending == 0
+    assert hasher.queued == 0
+
+
+# Test operations over max_pending fail fast instead of queueing
+def test_password_hasher_busy() -> None:
+    hasher = PasswordHasher(max_workers=1, max_pending=0)
+
+    with pytest.raises(PasswordHasherBusy):
+        asyncio.run(hasher.hash("secret"))
+    assert hasher.pending == 0
+
+
+# Test hashes made with another cost (or malformed) need a rehash
+@pytest.mark.parametrize(
+    "hashed_password, expected",
+    [
+        ("$2b$12$abcdefghijklmnopqrstuu", False),
+        ("$2b$10$abcdefghijklmnopqrstuu", True),
+        ("not-a-bcrypt-hash", True),
+    ],
+)
+def test_password_needs_rehash(
+    hashed_password: str, expected: bool, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "BCRYPT_ROUNDS", 12)
+    assert password_needs_rehash(hashed_password) is expected
+
+
+# Test get_password_hash uses the configured cost
+def test_get_password_hash_rounds(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "BCRYPT_ROUNDS", 5)
+    hashed = get_password_hash("secret")
+    assert hashed.startswith("$2b$05$")
+    assert not password_needs_rehash(hashed)
@@ -1,2 +1,6 @@
+from .security import PasswordHasher as PasswordHasher
+from .security import PasswordHasherBusy as PasswordHasherBusy
 from .security import get_password_hash as get_password_hash
+from .security import password_hasher as password_hasher
+from .security import password_needs_rehash as password_needs_rehash
 from .security import verify_password as verify_password
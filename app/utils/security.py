@@ -1,5 +1,16 @@
+import asyncio
+import threading
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, TypeVar
+
 import bcrypt
 
+from app.core.config import settings
+from app.core.tracing import start_span
+
+T = TypeVar("T")
+
 
 def get_password_hash(password: str) -> str:
     """
@@ -12,7 +23,7 @@ def get_password_hash(password: str) -> str:
         str: The hashed password.
     """
     pwd_bytes = password.encode("utf-8")
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)
     hashed_password = bcrypt.hashpw(password=pwd_bytes, salt=salt)
     return hashed_password.decode("utf-8")
 
@@ -33,3 +44,84 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return bcrypt.checkpw(
         password=plain_password_bytes, hashed_password=hashed_password_bytes
     )
+
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """
+    ### Check if a hash was made with a cost other than `BCRYPT_ROUNDS`.
+
+    Args:
+        hashed_password: The hashed password (`$2b$<cost>$<salt+hash>`).
+
+    Returns:
+        bool: True if the password should be hashed again, False otherwise.
+    """
+    parts = hashed_password.split("$")
+    if len(parts) < 4 or not parts[2].isdigit():
+        return True
+    rounds = int(parts[2])
+    return rounds != settings.BCRYPT_ROUNDS
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when too many bcrypt operations are pending."""
+
+
+class PasswordHasher:
+    """
+    ### Run bcrypt on a dedicated, bounded thread pool.
+
+    bcrypt releases the GIL, so hashing runs in parallel without blocking the
+    event loop, while `max_workers` caps the CPU it can take from regular traffic.
+    Operations over the limit wait in the pool queue (see `pending`), up to
+    `max_pending` operations, after that they fail fast with `PasswordHasherBusy`.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = settings.BCRYPT_WORKERS,
+        max_pending: int = settings.BCRYPT_MAX_PENDING,
+    ):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="bcrypt"
+        )
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self) -> int:
+        """Number of bcrypt operations running or waiting for a worker."""
+        return self._pending
+
+    @property
+    def queued(self) -> int:
+        """Number of bcrypt operations waiting for a worker (queue depth)."""
+        return max(0, self._pending - self.max_workers)
+
+    async def hash(self, password: str) -> str:
+        """Async version of `get_password_hash`."""
+        with start_span("bcrypt.hash", **{"bcrypt.rounds": settings.BCRYPT_ROUNDS}):
+            return await self._run(get_password_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """Async version of `verify_password`."""
+        with start_span("bcrypt.verify"):
+            return await self._run(verify_password, plain_password, hashed_password)
+
+    async def _run(self, func: Callable[..., T], *args: str) -> T:
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise PasswordHasherBusy(f"{self._pending} bcrypt operations pending")
+            self._pending += 1
+        future: Future[T] = self._executor.submit(func, *args)
+        future.add_done_callback(self._done)
+        return await asyncio.wrap_future(future)
+
+    def _done(self, _future: Future[Any]) -> None:
+        with self._lock:
+            self._pending -= 1
+
+
+password_hasher = PasswordHasher()
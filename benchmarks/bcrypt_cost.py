@@ -0,0 +1,31 @@
+"""
+Calibrate BCRYPT_ROUNDS: report the time per hash for each bcrypt cost.
+
+Usage: python -m benchmarks.bcrypt_cost [min_rounds] [max_rounds] [target_ms]
+"""
+
+import logging
+import sys
+import time
+
+import bcrypt
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+min_rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+max_rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 14
+target_ms = float(sys.argv[3]) if len(sys.argv) > 3 else 250.0
+password = b"benchmark-password"
+
+recommended = min_rounds
+for rounds in range(min_rounds, max_rounds + 1):
+    salt = bcrypt.gensalt(rounds=rounds)
+    start = time.perf_counter()
+    bcrypt.hashpw(password, salt)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    logging.info(f"rounds={rounds:>2}: {elapsed_ms:8.1f} ms/hash")
+    if elapsed_ms <= target_ms:
+        recommended = rounds
+
+logging.info(f"BCRYPT_ROUNDS={recommended} (slowest cost under {target_ms:.0f} ms)")
@@ -0,0 +1,38 @@
+"""
+Compare JWT verification with authlib against the verified-token cache.
+
+Usage: python -m benchmarks.jwt_decode [iterations]
+"""
+
+import logging
+import sys
+import timeit
+
+from app.core.oauth import SECRET_KEY, create_access_token, jwt
+from app.services.token_cache import TokenCache
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+token = create_access_token({"sub": 1})
+token_cache = TokenCache()
+
+
+def authlib_decode() -> None:
+    payload = jwt.decode(token, SECRET_KEY)
+    payload.validate()
+
+
+def cached_decode() -> None:
+    if token_cache.get(token) is None:
+        payload = jwt.decode(token, SECRET_KEY)
+        payload.validate()
+        token_cache.set(token, payload)
+
+
+for name, func in (("authlib", authlib_decode), ("cached", cached_decode)):
+    elapsed = timeit.timeit(func, number=iterations)
+    logging.info(
+        f"{name:>8}: {elapsed / iterations * 1e6:8.2f} us/op ({iterations} runs)"
+    )
@@ -0,0 +1,88 @@
+"""
+Compare the per-request overhead of `BaseHTTPMiddleware` against the pure ASGI
+`ProcessTimeHeaderMiddleware`, calling the ASGI apps directly (no server).
+
+Usage: python -m benchmarks.middleware_overhead [requests]
+"""
+
+import asyncio
+import logging
+import sys
+import time
+from collections.abc import Awaitable, Callable
+
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.middlewares import ProcessTimeHeaderMiddleware
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+requests = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+
+
+class BaseHTTPProcessTimeMiddleware(BaseHTTPMiddleware):
+    """The previous `ProcessTimeHeaderMiddleware`."""
+
+    async def dispatch(
+        self, request: Request, call_next: Callable[[Request], Awaitable[Response]]
+    ) -> Response:
+        start_time = time.time()
+        response = await call_next(request)
+        response.headers["X-Process-Time"] = str(time.time() - start_time)
+        return response
+
+
+async def endpoint(_scope: Scope, _receive: Receive, send: Send) -> None:
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+async def run(app: ASGIApp) -> float:
+    """Average time per request in microseconds."""
+    scope: Scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/",
+        "raw_path": b"/",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [],
+        "client": ("127.0.0.1", 1234),
+        "server": ("testserver", 80),
+    }
+
+    async def receive() -> Message:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(_message: Message) -> None:
+        pass
+
+    start = time.perf_counter_ns()
+    for _ in range(requests):
+        await app(scope, receive, send)
+    return (time.perf_counter_ns() - start) / requests / 1000
+
+
+async def main() -> None:
+    apps: dict[str, ASGIApp] = {
+        "none": endpoint,
+        "base_http": BaseHTTPProcessTimeMiddleware(endpoint),
+        "asgi": ProcessTimeHeaderMiddleware(endpoint),
+    }
+    baseline = await run(apps["none"])
+    for name, app in apps.items():
+        per_request = await run(app)
+        logging.info(
+            f"{name:>10}: {per_request:8.2f} us/request "
+            f"({per_request - baseline:+8.2f} us overhead, {requests} requests)"
+        )
+
+
+asyncio.run(main())
@@ -4,4 +4,9 @@ echo "Starting migrations..."
 alembic upgrade head
 echo "Finished migration"
 
-uvicorn app.main:app --host 0.0.0.0 --port 8000 --workers 4
\ No newline at end of file
+# Metrics of all the workers are aggregated from this directory
+export PROMETHEUS_MULTIPROC_DIR=${PROMETHEUS_MULTIPROC_DIR:-/tmp/prometheus}
+rm -rf "$PROMETHEUS_MULTIPROC_DIR"
+mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+
+uvicorn app.main:app --host 0.0.0.0 --port 8000 --workers ${WEB_CONCURRENCY:-4}
\ No newline at end of file